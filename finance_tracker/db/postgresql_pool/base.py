@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+import psycopg2.extras
+from psycopg2 import pool as psycopg2_pool
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# How often a checkout retries while every pooled connection is in use.
+POOL_RETRY_INTERVAL = 0.05
+
+def get_pool(alias, conn_params, min_size, max_size):
+    # Pools are per process so forked gunicorn workers never share sockets,
+    # and per parameter set so switching NAME (e.g. to the test database)
+    # never hands out connections to the old database.
+    key = (os.getpid(), alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = psycopg2_pool.ThreadedConnectionPool(min_size, max_size, **conn_params)
+        return _pools[key]
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that reuses connections from an in-process pool.
+
+    Meant for threaded workers: closing a Django connection hands the
+    underlying psycopg2 connection back to the pool instead of closing the
+    socket. Size the pool with ``OPTIONS['pool_min_size']`` and
+    ``OPTIONS['pool_max_size']``; when all ``pool_max_size`` connections are
+    checked out, a new checkout waits up to ``OPTIONS['pool_timeout']``
+    seconds before failing with ``OperationalError``. Keep ``pool_max_size``
+    at or above the worker's thread count. ``OPTIONS['isolation_level']`` is
+    honoured as by the stock backend.
+    """
+    
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pool_min_size = int(params.pop('pool_min_size', 1))
+        self.pool_max_size = int(params.pop('pool_max_size', 10))
+        self.pool_timeout = float(params.pop('pool_timeout', 30))
+        if not 0 <= self.pool_min_size <= self.pool_max_size or self.pool_max_size < 1:
+            raise ImproperlyConfigured(
+                f'Invalid pool size for database {self.alias!r}: need 0 <= pool_min_size '
+                f'<= pool_max_size and pool_max_size >= 1, got {self.pool_min_size} and {self.pool_max_size}.'
+            )
+        return params
+    
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        set_isolation_level = 'isolation_level' in options
+        if set_isolation_level:
+            try:
+                self.isolation_level = IsolationLevel(options['isolation_level'])
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {options['isolation_level']} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+        else:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        
+        self.pool = get_pool(self.alias, conn_params, self.pool_min_size, self.pool_max_size)
+        connection = self._checkout()
+        if set_isolation_level:
+            connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+    
+    def _checkout(self):
+        # ThreadedConnectionPool raises PoolError instead of waiting when
+        # every connection is in use.
+        deadline = time.monotonic() + self.pool_timeout
+        while True:
+            try:
+                return self.pool.getconn()
+            except psycopg2_pool.PoolError:
+                if self.pool.closed:
+                    raise
+                if time.monotonic() >= deadline:
+                    raise self.Database.OperationalError(
+                        f'Connection pool for database {self.alias!r} exhausted: all {self.pool_max_size} '
+                        f'connections stayed in use for {self.pool_timeout:g}s. Raise pool_max_size or '
+                        f'lower the number of threads per worker.'
+                    )
+                time.sleep(POOL_RETRY_INTERVAL)
+    
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            broken = bool(self.connection.closed)
+            if not broken:
+                try:
+                    self.connection.rollback()
+                except self.Database.Error:
+                    broken = True
+            pool = getattr(self, 'pool', None)
+            if pool is None or pool.closed:
+                self.connection.close()
+            else:
+                pool.putconn(self.connection, close=broken)
@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_SESSION_KEY = '_db_primary_until'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+@contextmanager
+def read_from(alias):
+    """Route ORM reads inside the block to ``alias`` (``None`` = primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+def reading_from_replica():
+    """Whether ORM reads in the current context go to a replica."""
+    return _read_alias.get() is not None
+
+def replica_alias_for(request):
+    """Return the replica alias to read from for ``request``, or ``None``.
+
+    ``None`` when no replica is configured or the session wrote recently
+    enough that the replica may not have caught up yet.
+    """
+    alias = settings.DATABASE_REPLICA_ALIAS
+    if alias not in settings.DATABASES:
+        return None
+    session = getattr(request, 'session', None)
+    if session is not None and session.get(STICKY_SESSION_KEY, 0) > time.time():
+        return None
+    return alias
+
+def stick_to_primary(request):
+    """Keep this session's reads on primary for ``REPLICA_STICKY_SECONDS``.
+
+    Only sessions that already exist are pinned: clients without one (such
+    as bearer-token clients) would otherwise get a new session row and
+    cookie on every write.
+    """
+    seconds = settings.REPLICA_STICKY_SECONDS
+    session = getattr(request, 'session', None)
+    if seconds > 0 and session is not None and session.session_key:
+        session[STICKY_SESSION_KEY] = time.time() + seconds
+
+class ReplicaRouter:
+    """Send reads to the alias chosen by ``read_from``; everything else to primary.
+
+    Reads only leave primary inside an explicit ``read_from`` block, so
+    code that does not opt in keeps read-your-writes semantics.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.DATABASE_REPLICA_ALIAS:
+            return False
+        return None
@@ -0,0 +1,24 @@
+from django.db.backends.sqlite3 import base
+
+PRAGMA_OPTIONS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite with write-ahead logging so readers don't block the writer.
+
+    ``OPTIONS['timeout']`` (seconds) is SQLite's busy timeout; ``journal_mode``
+    and ``synchronous`` in ``OPTIONS`` override the pragmas below.
+    """
+    
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {name: params.pop(name, default) for name, default in PRAGMA_OPTIONS.items()}
+        return params
+    
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
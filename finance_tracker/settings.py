@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 from decouple import config, Csv
 
+from finance_tracker.db import database_from_url
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-dev-key-change-in-production')
@@ -24,7 +26,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'tracker.middleware.QueryMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'tracker.middleware.ReplicaStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,13 +58,106 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'finance_tracker.wsgi.application'
 
+DATABASE_OPTIONS = {
+    'conn_max_age': config('DB_CONN_MAX_AGE', default=60, cast=int),
+    'conn_health_checks': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+    'pool': config('DB_POOL', default=False, cast=bool),
+    'pool_min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'pool_max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'pool_timeout': config('DB_POOL_TIMEOUT', default=30, cast=float),
+    'sqlite_timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+}
+
 DATABASES = {
+    'default': database_from_url(
+        config('DATABASE_URL', default=f"sqlite:///{os.path.join(BASE_DIR, 'db.sqlite3')}"),
+        **DATABASE_OPTIONS
+    )
+}
+
+# Optional read replica for dashboard and analytics reads. Tests use it as a
+# mirror of default rather than creating a second test database.
+DATABASE_REPLICA_ALIAS = 'replica'
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **database_from_url(DATABASE_REPLICA_URL, **DATABASE_OPTIONS),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['finance_tracker.db.routers.ReplicaRouter']
+
+# Seconds a session keeps reading from primary after it writes.
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+QUERY_METRICS_ENABLED = config('QUERY_METRICS_ENABLED', default=False, cast=bool)
+QUERY_METRICS_SERVER_TIMING = config('QUERY_METRICS_SERVER_TIMING', default=True, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+SLOW_QUERY_SAMPLE_RATE = config('SLOW_QUERY_SAMPLE_RATE', default=1.0, cast=float)
+SLOW_QUERY_STACK_DEPTH = config('SLOW_QUERY_STACK_DEPTH', default=8, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'tracker': {
+            'handlers': ['console'],
+            'level': config('TRACKER_LOG_LEVEL', default='INFO'),
+        },
+    },
+}
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='finance-tracker'),
     }
 }
 
+# Per-process backends: each gunicorn worker would keep its own copy of the
+# per-user data versions, so one worker could keep serving (or answering 304
+# for) data another worker has already changed.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SHARED_CACHE = CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+# Per-user response caching and ETags; only safe by default on a shared cache.
+USER_CACHE_ENABLED = config('USER_CACHE_ENABLED', default=SHARED_CACHE, cast=bool)
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=300, cast=int)
+# Render the dashboard, transactions and budgets pages with their first
+# screen of data (cached per user in template fragments) instead of empty.
+SERVER_RENDERED_PAGES = config('SERVER_RENDERED_PAGES', default=False, cast=bool)
+
+# With a shared cache, sessions and the logged-in user are read from the
+# cache first so that authenticating a request normally costs no queries.
+# A per-process cache would keep serving a session or user that another
+# worker has already logged out or changed, so both fall back to the
+# database there.
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default='django.contrib.sessions.backends.cached_db' if SHARED_CACHE else 'django.contrib.sessions.backends.db'
+)
+
+# ModelBackend stays listed so sessions that recorded it as their backend
+# keep resolving; new logins go through CachedModelBackend.
+AUTHENTICATION_BACKENDS = [
+    'tracker.authentication.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_ENABLED = config('AUTH_USER_CACHE_ENABLED', default=SHARED_CACHE, cast=bool)
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
+# Signed stateless "Authorization: Bearer" tokens for API clients. Token
+# revocation is kept in the cache, so enabling them needs a shared cache
+# (enforced by the tracker.E001 system check).
+API_TOKEN_AUTH_ENABLED = config('API_TOKEN_AUTH_ENABLED', default=False, cast=bool)
+API_TOKEN_MAX_AGE = config('API_TOKEN_MAX_AGE', default=60 * 60 * 24, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -85,12 +182,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
+        'tracker.authentication.SignedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson-backed when installed, stdlib json otherwise.
+    'DEFAULT_RENDERER_CLASSES': [
+        'tracker.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+BUDGET_ALERTS_ASYNC = config('BUDGET_ALERTS_ASYNC', default=True, cast=bool)
+# Months of past spend behind the seasonal forecast, and how many days of a
+# month must pass before a run-rate-only projection can raise an alert.
+BUDGET_FORECAST_HISTORY_MONTHS = config('BUDGET_FORECAST_HISTORY_MONTHS', default=3, cast=int)
+BUDGET_FORECAST_MIN_DAYS = config('BUDGET_FORECAST_MIN_DAYS', default=7, cast=int)
+# A transaction is an outlier when its robust z-score (median/MAD within its
+# category) exceeds ANOMALY_THRESHOLD in a category with ANOMALY_MIN_SAMPLES rows.
+ANOMALY_THRESHOLD = config('ANOMALY_THRESHOLD', default=3.5, cast=float)
+ANOMALY_MIN_SAMPLES = config('ANOMALY_MIN_SAMPLES', default=5, cast=int)
+ANOMALY_CACHE_TIMEOUT = config('ANOMALY_CACHE_TIMEOUT', default=86400, cast=int)
+
+TRANSACTION_PAGE_SIZE = config('TRANSACTION_PAGE_SIZE', default=50, cast=int)
+TRANSACTION_MAX_PAGE_SIZE = config('TRANSACTION_MAX_PAGE_SIZE', default=500, cast=int)
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
     'http://localhost:8000',
@@ -1,17 +1,27 @@
 from django.contrib import admin
-from .models import Transaction, Budget, BudgetAlert
+from .models import Transaction, Budget, BudgetAlert, BudgetAlertJob, MonthlyRollup, RecurringTransaction
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('user', 'type', 'category', 'amount', 'date', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('type', 'category', 'date', 'user')
     search_fields = ('user__username', 'description')
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-date', '-created_at')
 
+@admin.register(RecurringTransaction)
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'type', 'category', 'amount', 'frequency', 'interval', 'next_run', 'is_active')
+    list_select_related = ('user',)
+    list_filter = ('type', 'category', 'frequency', 'is_active')
+    search_fields = ('user__username', 'description')
+    readonly_fields = ('created_at', 'updated_at')
+
 @admin.register(Budget)
 class BudgetAdmin(admin.ModelAdmin):
     list_display = ('user', 'category', 'limit', 'month', 'year', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('category', 'month', 'year', 'user')
     search_fields = ('user__username',)
     readonly_fields = ('created_at', 'updated_at')
@@ -19,6 +29,22 @@ class BudgetAdmin(admin.ModelAdmin):
 @admin.register(BudgetAlert)
 class BudgetAlertAdmin(admin.ModelAdmin):
     list_display = ('user', 'budget', 'alert_type', 'percentage', 'is_read', 'created_at')
+    list_select_related = ('user', 'budget__user')
     list_filter = ('alert_type', 'is_read', 'created_at')
     search_fields = ('user__username',)
     readonly_fields = ('created_at',)
+
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'year', 'month', 'type', 'category', 'total', 'count')
+    list_select_related = ('user',)
+    list_filter = ('type', 'category', 'year', 'month')
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'year', 'month', 'type', 'category', 'total', 'count')
+
+@admin.register(BudgetAlertJob)
+class BudgetAlertJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'category', 'month', 'year', 'requested_at')
+    list_select_related = ('user',)
+    list_filter = ('category',)
+    search_fields = ('user__username',)
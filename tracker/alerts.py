@@ -0,0 +1,164 @@
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import bump_user_version
+from .forecasting import forecast_budgets
+from .models import Budget, BudgetAlert, BudgetAlertJob
+
+logger = logging.getLogger('tracker.alerts')
+
+# BudgetAlert.percentage holds at most 999.99.
+MAX_ALERT_PERCENTAGE = 999.99
+
+def create_budget_alert(budget, spent):
+    percentage = (spent / budget.limit * 100) if budget.limit > 0 else 0
+    percentage = min(percentage, MAX_ALERT_PERCENTAGE)
+    
+    if percentage >= 90:
+        BudgetAlert.objects.get_or_create(
+            user_id=budget.user_id,
+            budget=budget,
+            alert_type='critical',
+            defaults={'spent_amount': spent, 'percentage': percentage}
+        )
+    elif percentage >= 75:
+        BudgetAlert.objects.get_or_create(
+            user_id=budget.user_id,
+            budget=budget,
+            alert_type='warning',
+            defaults={'spent_amount': spent, 'percentage': percentage}
+        )
+
+def evaluate_budget_alerts(user, year, month, categories=None):
+    budgets = Budget.objects.filter(user=user, month=month, year=year).with_spent()
+    if categories is not None:
+        budgets = budgets.filter(category__in=categories)
+    
+    for budget in budgets:
+        create_budget_alert(budget, budget.spent)
+    
+    evaluate_forecast_alerts([user], year, month)
+
+def create_forecast_alerts(forecasts):
+    """Add a ``forecast`` alert for each budget projected to go over its limit.
+
+    Budgets already over the limit are left to the threshold alerts. Each
+    budget gets at most one forecast alert; new ones are bulk created.
+    """
+    at_risk = [
+        forecast for forecast in forecasts
+        if forecast['on_track_to_exceed'] and forecast['spent'] < forecast['budget'].limit
+    ]
+    if not at_risk:
+        return 0
+    
+    existing = set(BudgetAlert.objects.filter(
+        budget__in=[forecast['budget'] for forecast in at_risk], alert_type='forecast'
+    ).values_list('budget_id', flat=True))
+    alerts = BudgetAlert.objects.bulk_create([
+        BudgetAlert(
+            user_id=forecast['budget'].user_id,
+            budget=forecast['budget'],
+            alert_type='forecast',
+            spent_amount=forecast['spent'],
+            percentage=min(forecast['projected_percentage'], MAX_ALERT_PERCENTAGE)
+        )
+        for forecast in at_risk if forecast['budget'].pk not in existing
+    ])
+    # bulk_create skips BudgetAlert.save, which normally bumps the version.
+    for user_id in {alert.user_id for alert in alerts}:
+        bump_user_version(user_id)
+    return len(alerts)
+
+def evaluate_forecast_alerts(users, year, month, today=None):
+    """Run forecast alerts for ``users`` if ``year``/``month`` is the current month."""
+    today = today or timezone.localdate()
+    if (int(year), int(month)) != (today.year, today.month):
+        return 0
+    return create_forecast_alerts(forecast_budgets(users, today.year, today.month, today))
+
+def run_forecast_batch(today=None, chunk_size=500):
+    """Forecast alerts for every user with a budget this month, ``chunk_size`` users at a time.
+
+    Each chunk costs a fixed handful of queries however many budgets it has.
+    """
+    today = today or timezone.localdate()
+    user_ids = list(
+        Budget.objects.filter(year=today.year, month=today.month)
+        .values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+    created = 0
+    for offset in range(0, len(user_ids), chunk_size):
+        created += evaluate_forecast_alerts(user_ids[offset:offset + chunk_size], today.year, today.month, today)
+    return {'users': len(user_ids), 'alerts': created}
+
+def enqueue_budget_alerts(user, year, month, categories):
+    """Queue a job per category, or re-request it, in a single upsert.
+
+    One statement means a job the worker deletes concurrently is simply
+    inserted again, rather than lost between a read and an update.
+    """
+    now = timezone.now()
+    BudgetAlertJob.objects.bulk_create(
+        [
+            BudgetAlertJob(user=user, year=year, month=month, category=category, requested_at=now)
+            for category in set(categories)
+        ],
+        update_conflicts=True,
+        unique_fields=['user', 'year', 'month', 'category'],
+        update_fields=['requested_at']
+    )
+
+def schedule_budget_alerts(user, year, month, categories):
+    """Evaluate alerts for the given budgets now or hand them to the worker."""
+    if settings.BUDGET_ALERTS_ASYNC:
+        enqueue_budget_alerts(user, year, month, categories)
+    else:
+        evaluate_budget_alerts(user, year, month, categories=categories)
+
+def process_alert_jobs(batch_size=100):
+    """Evaluate up to ``batch_size`` pending jobs and return how many ran.
+
+    All budgets touched by the batch are loaded with their spend in a single
+    query. A job is only removed if it was not re-requested while the batch
+    ran, so writes arriving mid-batch are picked up on the next pass. A
+    budget whose alert cannot be saved is logged and skipped so that it
+    cannot hold up the rest of the queue.
+    """
+    with db_transaction.atomic():
+        jobs = BudgetAlertJob.objects.order_by('requested_at')
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        jobs = list(jobs[:batch_size])
+        if not jobs:
+            return 0
+        
+        buckets = Q()
+        processed = Q()
+        for job in jobs:
+            buckets |= Q(user_id=job.user_id, year=job.year, month=job.month, category=job.category)
+            processed |= Q(pk=job.pk, requested_at=job.requested_at)
+        
+        for budget in Budget.objects.filter(buckets).with_spent():
+            try:
+                with db_transaction.atomic():
+                    create_budget_alert(budget, budget.spent)
+            except Exception:
+                logger.exception('Budget alert for budget %s failed', budget.pk)
+        
+        today = timezone.localdate()
+        try:
+            with db_transaction.atomic():
+                evaluate_forecast_alerts(
+                    {job.user_id for job in jobs if (job.year, job.month) == (today.year, today.month)},
+                    today.year, today.month, today
+                )
+        except Exception:
+            logger.exception('Forecast alerts for %d jobs failed', len(jobs))
+        
+        BudgetAlertJob.objects.filter(processed).delete()
+    return len(jobs)
@@ -0,0 +1,110 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import get_user_version
+from .models import Transaction
+from .serializers import format_money
+
+ANOMALIES_KEY = 'tracker:user:{}:v{}:anomalies'
+
+# Scales the MAD so robust scores read like standard deviations for normal data.
+MAD_SCALE = 0.6745
+# Same for the mean absolute deviation, used when more than half of a
+# category's amounts are identical and its MAD is 0.
+MEAN_AD_SCALE = 1.2533
+
+def _group_medians(groups, values, group_count):
+    """Median of ``values`` within each group, for every group in one sort."""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    lower = sorted_values[(starts + (counts - 1) // 2)[present]]
+    upper = sorted_values[(starts + counts // 2)[present]]
+    medians = np.zeros(group_count)
+    medians[present] = (lower + upper) / 2
+    return medians, counts
+
+def find_anomalies(ids, dates, types, categories, amounts):
+    """Flag outliers and duplicates among one user's transactions.
+
+    Takes parallel sequences and returns a list of ``(index, reasons, score,
+    median)`` tuples. A transaction is an ``outlier`` when its robust z-score,
+    ``0.6745 * (amount - median) / MAD`` within its type and category, is
+    above ``ANOMALY_THRESHOLD`` and the category has at least
+    ``ANOMALY_MIN_SAMPLES`` rows. Where the MAD is 0 (mostly repeated
+    amounts) the score is ``(amount - median) / (1.2533 * mean absolute
+    deviation)`` instead. It is a ``duplicate`` when another row has
+    the same date, type, category and amount.
+    """
+    if not len(ids):
+        return []
+    amounts = np.asarray(amounts, dtype=float)
+    _, groups = np.unique(
+        np.char.add(np.char.add(np.asarray(types, dtype=str), ':'), np.asarray(categories, dtype=str)),
+        return_inverse=True
+    )
+    group_count = groups.max() + 1
+    
+    medians, counts = _group_medians(groups, amounts, group_count)
+    deviations = np.abs(amounts - medians[groups])
+    mads, _ = _group_medians(groups, deviations, group_count)
+    mean_ads = np.bincount(groups, weights=deviations, minlength=group_count) / np.maximum(counts, 1)
+    spreads = np.where(mads > 0, mads / MAD_SCALE, mean_ads * MEAN_AD_SCALE)[groups]
+    scores = np.divide(deviations, spreads, out=np.zeros_like(amounts), where=spreads > 0)
+    outliers = (scores > settings.ANOMALY_THRESHOLD) & (counts[groups] >= settings.ANOMALY_MIN_SAMPLES)
+    
+    day_numbers = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+    cents = np.rint(amounts * 100).astype(np.int64)
+    _, entries, repeats = np.unique(
+        np.stack([day_numbers, groups, cents], axis=1), axis=0, return_inverse=True, return_counts=True
+    )
+    duplicates = repeats[entries.ravel()] > 1
+    
+    results = []
+    for index in np.flatnonzero(outliers | duplicates):
+        reasons = []
+        if outliers[index]:
+            reasons.append('outlier')
+        if duplicates[index]:
+            reasons.append('duplicate')
+        results.append((int(index), reasons, round(float(scores[index]), 2), medians[groups[index]]))
+    return results
+
+def detect_anomalies(user_id):
+    """Anomalous transactions of a user, newest first, as serializable dicts.
+
+    The whole history is read with one ``values_list`` query and scored with
+    array operations, then cached until the user's data version changes.
+    Like the per-user response cache, caching is skipped when
+    ``USER_CACHE_ENABLED`` is off.
+    """
+    if settings.USER_CACHE_ENABLED:
+        key = ANOMALIES_KEY.format(user_id, get_user_version(user_id))
+        anomalies = cache.get(key)
+        if anomalies is not None:
+            return anomalies
+    
+    rows = list(
+        Transaction.objects.filter(user_id=user_id)
+        .order_by('-date', '-id').values_list('id', 'date', 'type', 'category', 'amount')
+    )
+    columns = list(zip(*rows)) or [(), (), (), (), ()]
+    anomalies = [
+        {
+            'id': rows[index][0],
+            'date': rows[index][1].isoformat(),
+            'type': rows[index][2],
+            'category': rows[index][3],
+            'amount': format_money(rows[index][4]),
+            'reasons': reasons,
+            'score': score,
+            'category_median': format_money(median),
+        }
+        for index, reasons, score, median in find_anomalies(*columns)
+    ]
+    if settings.USER_CACHE_ENABLED:
+        cache.set(key, anomalies, settings.ANOMALY_CACHE_TIMEOUT)
+    return anomalies
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+    
+    def ready(self):
+        # Connects the cached-user invalidation signal handlers and
+        # registers the system checks.
+        from . import authentication, checks  # noqa: F401
@@ -2,8 +2,11 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from .authentication import SignedTokenAuthentication, issue_token, revoke_tokens
 from .serializers import UserSerializer
 
 @api_view(['POST'])
@@ -48,6 +51,15 @@ def login_view(request):
     user = authenticate(request, username=username, password=password)
     
     if user is not None:
+        if request.data.get('token') in (True, 'true', 'True', '1'):
+            if not settings.API_TOKEN_AUTH_ENABLED:
+                return Response({'error': 'Token authentication is disabled'}, status=status.HTTP_400_BAD_REQUEST)
+            user_logged_in.send(sender=user.__class__, request=request, user=user)
+            data = UserSerializer(user).data
+            data['token'] = issue_token(user)
+            data['expires_in'] = settings.API_TOKEN_MAX_AGE
+            return Response(data, status=status.HTTP_200_OK)
+        
         login(request, user)
         serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -57,7 +69,11 @@ def login_view(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
-    logout(request)
+    if isinstance(request.successful_authenticator, SignedTokenAuthentication):
+        revoke_tokens(request.user)
+        user_logged_out.send(sender=request.user.__class__, request=request, user=request.user)
+    else:
+        logout(request)
     return Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
@@ -0,0 +1,116 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core import signing
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+USER_KEY = 'tracker:auth:user:{}'
+TOKENS_REVOKED_KEY = 'tracker:auth:tokens-revoked:{}'
+TOKEN_SALT = 'tracker.api-token'
+
+class CachedModelBackend(ModelBackend):
+    """``ModelBackend`` whose ``get_user`` is served from the cache.
+
+    ``AuthenticationMiddleware`` resolves the session's user on every
+    request; caching it removes the ``auth_user`` query. Entries are
+    dropped whenever the user is saved (password change, last_login,
+    profile edits), deleted or logged out, and expire after
+    ``AUTH_USER_CACHE_TIMEOUT`` to cover bulk ``update()`` calls that skip
+    signals. With ``AUTH_USER_CACHE_ENABLED`` off it behaves exactly like
+    ``ModelBackend``.
+    """
+
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE_ENABLED:
+            return super().get_user(user_id)
+        key = USER_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+def invalidate_cached_user(user_id):
+    cache.delete(USER_KEY.format(user_id))
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def _invalidate_saved_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+@receiver(user_logged_in)
+def _cache_logged_in_user(sender, request, user, **kwargs):
+    # Runs after ``update_last_login`` has saved (and so invalidated) the
+    # user, so the first request after logging in is already a cache hit.
+    if settings.AUTH_USER_CACHE_ENABLED:
+        cache.set(USER_KEY.format(user.pk), user, settings.AUTH_USER_CACHE_TIMEOUT)
+
+@receiver(user_logged_out)
+def _invalidate_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
+
+def issue_token(user):
+    """Signed, stateless API token for ``user``.
+
+    Valid for ``API_TOKEN_MAX_AGE`` seconds, until the password changes, or
+    until ``revoke_tokens`` is called for the user.
+    """
+    return signing.dumps(
+        {'u': user.pk, 'h': user.get_session_auth_hash(), 'iat': time.time()},
+        salt=TOKEN_SALT
+    )
+
+def revoke_tokens(user):
+    """Reject every token issued to ``user`` so far.
+
+    The marker lives in the cache, so it only takes effect in every process
+    when the cache backend is shared between them; the ``tracker.E001``
+    system check refuses token auth on a per-process cache.
+    """
+    # Only needs to outlive the tokens it revokes.
+    cache.set(TOKENS_REVOKED_KEY.format(user.pk), time.time(), settings.API_TOKEN_MAX_AGE)
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """``Authorization: Bearer <token>`` with tokens from ``issue_token``.
+
+    Verifying a token needs no database query: the signature is checked
+    locally and the user comes from ``CachedModelBackend``. Returns
+    ``None`` (letting other authenticators run) when
+    ``API_TOKEN_AUTH_ENABLED`` is off or no bearer token was sent.
+    """
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        if not settings.API_TOKEN_AUTH_ENABLED:
+            return None
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+
+        try:
+            payload = signing.loads(header[1].decode(), salt=TOKEN_SALT, max_age=settings.API_TOKEN_MAX_AGE)
+        except (signing.BadSignature, UnicodeDecodeError):
+            raise AuthenticationFailed('Invalid or expired token.')
+
+        user = CachedModelBackend().get_user(payload['u'])
+        if user is None or not constant_time_compare(payload['h'], user.get_session_auth_hash()):
+            raise AuthenticationFailed('Invalid or expired token.')
+        revoked = cache.get(TOKENS_REVOKED_KEY.format(user.pk))
+        if revoked is not None and payload['iat'] <= revoked:
+            raise AuthenticationFailed('Invalid or expired token.')
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return 'Bearer'
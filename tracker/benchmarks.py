@@ -0,0 +1,182 @@
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .dates import add_months
+from .models import Budget, MonthlyRollup, Transaction
+from .renderers import FastJSONRenderer
+from .serializers import TransactionSerializer
+
+BENCHMARK_USER_PREFIX = 'bench_user_'
+BENCHMARK_PASSWORD = 'bench-password'
+BENCHMARK_ENDPOINTS = [
+    '/api/transactions/',
+    '/api/budgets/current_month/',
+    '/api/dashboard/stats/',
+    '/api/dashboard/chart_data/',
+    '/api/transactions/monthly_summary/',
+]
+
+# Benchmarks clear the cache between iterations, so they get a private one
+# rather than wiping the sessions and cached reads of a real deployment.
+# Per-user caching is on so that ``use_cache`` measures the cached path.
+BENCHMARK_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tracker-benchmarks'}},
+    'USER_CACHE_ENABLED': True,
+}
+
+EXPENSE_CATEGORIES = [code for code, _ in Budget.CATEGORY_CHOICES]
+INCOME_CATEGORIES = ['salary', 'freelance', 'investment']
+
+def seed_benchmark_data(users, transactions_per_user, months=12, seed=42, end_date=None, batch_size=2000):
+    """Create ``users`` users with ``transactions_per_user`` transactions each.
+
+    The same arguments always generate the same rows relative to
+    ``end_date``. Transactions are spread over the last ``months`` calendar
+    months and every expense category gets a budget for each month. Existing
+    benchmark users are deleted first.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or timezone.localdate()
+    start_year, start_month = add_months(end_date.year, end_date.month, -(months - 1))
+    start_date = end_date.replace(year=start_year, month=start_month, day=1)
+    span = (end_date - start_date).days + 1
+    
+    User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).delete()
+    password = make_password(BENCHMARK_PASSWORD)
+    created_users = User.objects.bulk_create([
+        User(username=f'{BENCHMARK_USER_PREFIX}{i}', email=f'{BENCHMARK_USER_PREFIX}{i}@example.com', password=password)
+        for i in range(users)
+    ])
+    if not connection.features.can_return_rows_from_bulk_insert:
+        created_users = list(User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).order_by('id'))
+    
+    for user in created_users:
+        transactions = []
+        for _ in range(transactions_per_user):
+            if rng.random() < 0.15:
+                type, category = 'income', rng.choice(INCOME_CATEGORIES)
+                amount = Decimal(rng.randint(50000, 500000)) / 100
+            else:
+                type, category = 'expense', rng.choice(EXPENSE_CATEGORIES)
+                amount = Decimal(rng.randint(100, 20000)) / 100
+            transactions.append(Transaction(
+                user=user,
+                type=type,
+                category=category,
+                amount=amount,
+                date=start_date + timedelta(days=rng.randrange(span)),
+                description=f'Benchmark {category}'
+            ))
+        Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+        
+        Budget.objects.bulk_create([
+            Budget(
+                user=user,
+                category=category,
+                limit=Decimal(rng.randint(100, 2000)),
+                month=month,
+                year=year
+            )
+            for year, month in (add_months(start_year, start_month, i) for i in range(months))
+            for category in EXPENSE_CATEGORIES
+        ], batch_size=batch_size)
+        
+        MonthlyRollup.objects.rebuild(user=user)
+    
+    return created_users
+
+def _percentile(values, percent):
+    values = sorted(values)
+    index = max(0, int(round(percent / 100 * len(values) + 0.5)) - 1)
+    return values[min(index, len(values) - 1)]
+
+@override_settings(**BENCHMARK_SETTINGS)
+def benchmark_endpoint(client, path, iterations=20, use_cache=False):
+    client.get(path)
+    
+    timings = []
+    query_counts = []
+    for _ in range(iterations):
+        if not use_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - start) * 1000)
+        query_counts.append(len(queries))
+    
+    if not use_cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'endpoint': path,
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(_percentile(timings, 50), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': max(query_counts),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_bytes': len(response.content)
+    }
+
+@override_settings(**BENCHMARK_SETTINGS)
+def run_benchmarks(sizes, users=1, iterations=20, endpoints=None, use_cache=False, seed=42):
+    """Seed each data size in turn and time ``endpoints`` as the first user."""
+    results = []
+    for size in sizes:
+        created_users = seed_benchmark_data(users, size, seed=seed)
+        client = Client()
+        client.force_login(created_users[0])
+        for path in endpoints or BENCHMARK_ENDPOINTS:
+            result = benchmark_endpoint(client, path, iterations=iterations, use_cache=use_cache)
+            result['transactions_per_user'] = size
+            results.append(result)
+    return results
+
+def benchmark_serialization(rows=10000, iterations=5, seed=42):
+    """Compare the stock and fast paths for rendering a ``rows``-long transaction list.
+
+    The stock path is ``TransactionSerializer(many=True)`` over model
+    instances plus DRF's ``JSONRenderer``; the fast path is
+    ``represent_values`` over ``values()`` rows plus ``FastJSONRenderer``.
+    Both timings include fetching the rows.
+    """
+    user = seed_benchmark_data(1, rows, seed=seed)[0]
+    queryset = Transaction.objects.filter(user=user).order_by('-date', '-created_at', '-id')
+    paths = {
+        'serializer': lambda: JSONRenderer().render(TransactionSerializer(queryset.all(), many=True).data),
+        'fast': lambda: FastJSONRenderer().render(
+            TransactionSerializer.represent_values(queryset.values(*TransactionSerializer.Meta.fields))
+        ),
+    }
+    
+    result = {'rows': rows, 'iterations': iterations}
+    for name, render in paths.items():
+        render()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            render()
+            timings.append((time.perf_counter() - start) * 1000)
+        result[f'{name}_p50_ms'] = round(_percentile(timings, 50), 3)
+    result['speedup'] = round(result['serializer_p50_ms'] / result['fast_p50_ms'], 2)
+    return result
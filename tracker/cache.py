@@ -0,0 +1,149 @@
+import hashlib
+import time
+from datetime import datetime, time as dt_time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from finance_tracker.db.routers import reading_from_replica
+
+VERSION_KEY = 'tracker:user:{}:version'
+MODIFIED_KEY = 'tracker:user:{}:modified'
+STATS_KEY = 'tracker:cache:{}'
+
+def get_user_version(user_id):
+    version = cache.get(VERSION_KEY.format(user_id))
+    if version is None:
+        # Start from a timestamp rather than 1 so that an evicted version key
+        # can never resurrect entries cached under an older version.
+        version = time.time_ns()
+        cache.add(VERSION_KEY.format(user_id), version, None)
+        version = cache.get(VERSION_KEY.format(user_id), version)
+    return version
+
+def bump_user_version(user_id):
+    try:
+        cache.incr(VERSION_KEY.format(user_id))
+    except ValueError:
+        cache.set(VERSION_KEY.format(user_id), time.time_ns(), None)
+    cache.set(MODIFIED_KEY.format(user_id), int(time.time()), None)
+
+def get_user_last_modified(user_id):
+    """Epoch seconds of the user's last write, or ``None`` if unknown."""
+    return cache.get(MODIFIED_KEY.format(user_id))
+
+def _count(name):
+    key = STATS_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+def cache_stats():
+    hits = cache.get(STATS_KEY.format('hits'), 0)
+    misses = cache.get(STATS_KEY.format('misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0
+    }
+
+def _query_string(params):
+    return '&'.join(f'{key}={params[key]}' for key in sorted(params))
+
+def user_cache_key(user_id, name, params):
+    query = _query_string(params)
+    # The current date is part of the key because the endpoints default to
+    # "this month" when no month/year is given.
+    return f'tracker:user:{user_id}:v{get_user_version(user_id)}:{name}:{timezone.now().date()}:{query}'
+
+def cached_per_user(name):
+    """Cache a viewset action's successful response per user and query string.
+
+    Entries are keyed on the user's data version, so any write that calls
+    ``bump_user_version`` makes all of that user's cached reads stale at once.
+    Responses computed on a read replica are not stored: the replica may
+    still lag behind the write that produced the current version.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.USER_CACHE_ENABLED:
+                return view_func(self, request, *args, **kwargs)
+            
+            key = user_cache_key(request.user.pk, name, request.query_params)
+            data = cache.get(key)
+            if data is not None:
+                _count('hits')
+                return Response(data)
+            
+            _count('misses')
+            response = view_func(self, request, *args, **kwargs)
+            if response.status_code == 200 and not reading_from_replica():
+                cache.set(key, response.data, settings.USER_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+def user_etag(request, dated=True):
+    """ETag for a read of the user's data at ``request``'s URL.
+
+    Built from the user's data version, so it costs no queries. ``dated``
+    folds in today's date for endpoints that default to the current month.
+    """
+    parts = [
+        str(get_user_version(request.user.pk)),
+        request.path,
+        _query_string(request.query_params),
+        request.accepted_renderer.format,
+    ]
+    if dated:
+        parts.append(str(timezone.now().date()))
+    return quote_etag(hashlib.md5(':'.join(parts).encode()).hexdigest())
+
+def user_last_modified(user_id, dated=True):
+    modified = get_user_last_modified(user_id)
+    if modified is not None and dated:
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        modified = max(modified, int(midnight.timestamp()))
+    return modified
+
+def conditional_per_user(view_func):
+    """Answer conditional requests for a viewset action from the user's data version.
+
+    GETs with a matching ``If-None-Match``/``If-Modified-Since`` get a 304
+    before the view runs. Detail writes honour ``If-Match`` and return 412
+    when the user's data changed since the client's copy was fetched.
+    ``Last-Modified`` has one-second resolution, so the ETag is the
+    authoritative validator. Off, like ``cached_per_user``, when
+    ``USER_CACHE_ENABLED`` is. Responses read from a replica get no
+    validators, since they may predate the current version.
+    """
+    @wraps(view_func)
+    def wrapper(self, request, *args, **kwargs):
+        if not settings.USER_CACHE_ENABLED:
+            return view_func(self, request, *args, **kwargs)
+        
+        dated = not kwargs
+        etag = user_etag(request, dated)
+        last_modified = user_last_modified(request.user.pk, dated)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view_func(self, request, *args, **kwargs)
+            if request.method not in ('GET', 'HEAD'):
+                etag = user_etag(request, dated)
+                last_modified = user_last_modified(request.user.pk, dated)
+        
+        if response.status_code == 304 or (response.status_code == 200 and not reading_from_replica()):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+    return wrapper
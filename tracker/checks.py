@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+@register()
+def check_token_revocation_cache(app_configs, **kwargs):
+    """Token revocation markers must be visible to every worker process."""
+    if settings.API_TOKEN_AUTH_ENABLED and settings.CACHES['default']['BACKEND'] in settings.LOCAL_CACHE_BACKENDS:
+        return [Error(
+            'API_TOKEN_AUTH_ENABLED needs a cache shared between processes.',
+            hint='revoke_tokens() stores its marker in the cache, so with '
+                 f"{settings.CACHES['default']['BACKEND']} a revoked token stays valid in every "
+                 'other worker. Set CACHE_BACKEND to Redis or FileBasedCache.',
+            id='tracker.E001',
+        )]
+    return []
@@ -0,0 +1,20 @@
+from datetime import date
+
+def month_range(year, month):
+    """Return ``(first_day, next_month_first_day)`` for a calendar month.
+
+    Filtering with ``date >= first_day AND date < next_month_first_day``
+    keeps month queries sargable so they can use the ``date`` indexes.
+    """
+    year, month = int(year), int(month)
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year, month + 1, 1)
+    return start, end
+
+def add_months(year, month, delta):
+    """Shift ``(year, month)`` by ``delta`` calendar months."""
+    index = int(year) * 12 + int(month) - 1 + delta
+    return index // 12, index % 12 + 1
@@ -0,0 +1,56 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils.text import compress_sequence
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ['id', 'date', 'type', 'category', 'amount', 'description']
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+class _Echo:
+    def write(self, value):
+        return value
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+def _jsonl_lines(rows):
+    for id, date, type, category, amount, description in rows:
+        yield json.dumps({
+            'id': id,
+            'date': date.isoformat(),
+            'type': type,
+            'category': category,
+            'amount': str(amount),
+            'description': description
+        }) + '\n'
+
+def _encode(lines):
+    for line in lines:
+        yield line.encode('utf-8')
+
+def stream_transactions(queryset, export_format, filename, gzip=False):
+    """Stream ``queryset`` as CSV or JSON lines without loading it into memory.
+
+    Rows are read as tuples with ``values_list().iterator()`` so memory stays
+    flat regardless of how many transactions the user has.
+    """
+    rows = queryset.order_by('date', 'id').values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    lines = _csv_lines(rows) if export_format == 'csv' else _jsonl_lines(rows)
+    content = _encode(lines)
+    if gzip:
+        content = compress_sequence(content)
+    
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    response['Vary'] = 'Accept-Encoding'
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,122 @@
+import calendar
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .dates import add_months, month_range
+from .models import Budget, Transaction
+
+def load_daily_expenses(users, year, month, history_months):
+    """Daily expense totals per ``(user_id, category)`` as one NumPy array.
+
+    Returns ``(keys, grid)``. ``keys`` maps ``(user_id, category)`` to a row
+    of ``grid``, which is shaped ``(series, history_months + 1, 31)``: one
+    slot per day of each of the ``history_months`` months before
+    ``year``/``month``, then the month itself, with fewer history months
+    when they would reach back before year 1. Read with one grouped query.
+    """
+    history_months = min(history_months, int(year) * 12 + int(month) - 13)
+    start_year, start_month = add_months(year, month, -history_months)
+    start, _ = month_range(start_year, start_month)
+    _, end = month_range(year, month)
+    rows = list(
+        Transaction.objects.filter(user__in=users, type='expense', date__gte=start, date__lt=end)
+        .values_list('user_id', 'category', 'date').annotate(total=Sum('amount')).order_by()
+    )
+    
+    keys = {}
+    for user_id, category, _, _ in rows:
+        keys.setdefault((user_id, category), len(keys))
+    grid = np.zeros((len(keys), history_months + 1, 31))
+    if rows:
+        series = np.fromiter((keys[(row[0], row[1])] for row in rows), dtype=np.intp, count=len(rows))
+        months = np.fromiter(
+            ((row[2].year - start_year) * 12 + row[2].month - start_month for row in rows), dtype=np.intp, count=len(rows)
+        )
+        days = np.fromiter((row[2].day - 1 for row in rows), dtype=np.intp, count=len(rows))
+        grid[series, months, days] = np.fromiter((row[3] for row in rows), dtype=float, count=len(rows))
+    return keys, grid
+
+def project_month_end(grid, days_elapsed, days_in_month):
+    """End-of-month spend projections for every series in ``grid`` at once.
+
+    Returns ``(spent, run_rate, seasonal, has_history)`` arrays:
+
+    * ``run_rate`` extrapolates the month's average daily spend so far.
+    * ``seasonal`` adds what past months spent after the same day of the
+      month (averaged over months with any spend) to the spend so far, so
+      bills that land late in the month are expected before they arrive.
+    """
+    history, current = grid[:, :-1, :], grid[:, -1, :]
+    spent = current[:, :days_elapsed].sum(axis=1)
+    if days_elapsed:
+        run_rate = spent / days_elapsed * days_in_month
+    else:
+        run_rate = np.zeros_like(spent)
+    
+    history_totals = history.sum(axis=2)
+    active_months = (history_totals > 0).sum(axis=1)
+    has_history = active_months > 0
+    remaining = (history_totals - history[:, :, :days_elapsed].sum(axis=2)).sum(axis=1)
+    seasonal = spent + np.divide(remaining, active_months, out=np.zeros_like(remaining), where=has_history)
+    return spent, run_rate, seasonal, has_history
+
+def _money(value):
+    return Decimal(f'{value:.2f}')
+
+def forecast_budgets(users, year, month, today=None):
+    """Project end-of-month spend for every budget of ``users`` in ``year``/``month``.
+
+    ``users`` is a list of users or user ids, from one user to a whole
+    cohort; the work is two queries plus array arithmetic however many
+    budgets there are. The projection is the seasonal one when the category
+    had spend in the last ``BUDGET_FORECAST_HISTORY_MONTHS`` months and the
+    run rate otherwise.
+    Run-rate-only projections are not trusted to flag a budget before
+    ``BUDGET_FORECAST_MIN_DAYS`` days of the month have passed.
+    """
+    today = today or timezone.localdate()
+    start, end = month_range(year, month)
+    days_in_month = calendar.monthrange(start.year, start.month)[1]
+    if today < start:
+        days_elapsed = 0
+    elif today >= end:
+        days_elapsed = days_in_month
+    else:
+        days_elapsed = today.day
+    
+    budgets = list(Budget.objects.filter(user__in=users, year=year, month=month).order_by('user_id', 'category'))
+    if not budgets:
+        return []
+    
+    keys, grid = load_daily_expenses(users, year, month, settings.BUDGET_FORECAST_HISTORY_MONTHS)
+    spent, run_rate, seasonal, has_history = project_month_end(grid, days_elapsed, days_in_month)
+    
+    # Budgets whose category had no spend at all point at an appended zero row.
+    index = np.array([keys.get((budget.user_id, budget.category), -1) for budget in budgets], dtype=np.intp)
+    spent, run_rate, seasonal = (np.append(values, 0.0)[index] for values in (spent, run_rate, seasonal))
+    has_history = np.append(has_history, False)[index]
+    
+    limits = np.array([float(budget.limit) for budget in budgets])
+    projected = np.where(has_history, seasonal, run_rate)
+    percentage = np.divide(projected * 100, limits, out=np.zeros_like(projected), where=limits > 0)
+    reliable = has_history | (days_elapsed >= settings.BUDGET_FORECAST_MIN_DAYS)
+    exceeds = (projected > limits) & reliable
+    
+    return [
+        {
+            'budget': budget,
+            'days_elapsed': days_elapsed,
+            'days_in_month': days_in_month,
+            'spent': _money(spent[i]),
+            'run_rate': _money(run_rate[i]),
+            'seasonal': _money(seasonal[i]) if has_history[i] else None,
+            'projected': _money(projected[i]),
+            'projected_percentage': round(float(percentage[i]), 2),
+            'on_track_to_exceed': bool(exceeds[i]),
+        }
+        for i, budget in enumerate(budgets)
+    ]
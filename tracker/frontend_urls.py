@@ -1,11 +1,13 @@
 from django.urls import path
 from django.views.generic import TemplateView
 
+from .frontend_views import BudgetsPageView, DashboardPageView, TransactionsPageView
+
 urlpatterns = [
     path('', TemplateView.as_view(template_name='index.html'), name='home'),
     path('login/', TemplateView.as_view(template_name='login.html'), name='login'),
     path('register/', TemplateView.as_view(template_name='register.html'), name='register'),
-    path('dashboard/', TemplateView.as_view(template_name='dashboard.html'), name='dashboard'),
-    path('transactions/', TemplateView.as_view(template_name='transactions.html'), name='transactions'),
-    path('budgets/', TemplateView.as_view(template_name='budgets.html'), name='budgets'),
+    path('dashboard/', DashboardPageView.as_view(), name='dashboard'),
+    path('transactions/', TransactionsPageView.as_view(), name='transactions'),
+    path('budgets/', BudgetsPageView.as_view(), name='budgets'),
 ]
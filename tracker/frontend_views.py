@@ -0,0 +1,90 @@
+import copy
+from functools import cache
+
+from django.conf import settings
+from django.http import QueryDict
+from django.utils import timezone
+from django.views.generic import TemplateView
+from rest_framework.request import Request
+
+from .cache import get_user_version
+from .models import Budget, Transaction
+from .pagination import TransactionCursorPagination
+from .serializers import BudgetSerializer, TransactionSerializer
+from .utils import get_dashboard_overview
+from .views import BudgetViewSet, TransactionViewSet
+
+DASHBOARD_RECENT_TRANSACTIONS = 5
+# The projections the pages' scripts request from the API.
+TRANSACTION_TABLE_FIELDS = TransactionViewSet.field_projections['table']
+BUDGET_CARD_FIELDS = BudgetViewSet.field_projections['compact']
+
+class ServerRenderedPageView(TemplateView):
+    """Page that can ship its first screen of data in the HTML.
+
+    With ``SERVER_RENDERED_PAGES`` on and a logged-in user, the context gets
+    ``server_rendered`` plus the keys of ``get_initial_data``. Those values
+    are callables run at most once, so a template that wraps them in
+    ``{% cache %}`` (keyed on ``data_version``) runs no queries on a hit.
+    Otherwise the page renders empty and its script loads everything from
+    the API as before.
+    """
+    
+    def get_initial_data(self, request):
+        return {}
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        context['server_rendered'] = settings.SERVER_RENDERED_PAGES and user.is_authenticated
+        if context['server_rendered']:
+            context['data_version'] = get_user_version(user.pk)
+            # Part of the fragment keys because the pages show "this month".
+            context['today'] = timezone.localdate().isoformat()
+            # A timeout of 0 renders the fragments without caching them.
+            context['fragment_timeout'] = settings.USER_CACHE_TIMEOUT if settings.USER_CACHE_ENABLED else 0
+            context.update({name: cache(loader) for name, loader in self.get_initial_data(self.request).items()})
+        return context
+
+class DashboardPageView(ServerRenderedPageView):
+    template_name = 'dashboard.html'
+    
+    def get_initial_data(self, request):
+        return {'overview': lambda: get_dashboard_overview(request.user, DASHBOARD_RECENT_TRANSACTIONS)}
+
+class TransactionsPageView(ServerRenderedPageView):
+    template_name = 'transactions.html'
+    
+    def get_initial_data(self, request):
+        return {'transactions': lambda: first_transactions_page(request)}
+
+class BudgetsPageView(ServerRenderedPageView):
+    template_name = 'budgets.html'
+    
+    def get_initial_data(self, request):
+        return {'budgets': lambda: current_month_budgets(request.user)}
+
+def first_transactions_page(request):
+    """The first ``/api/transactions/?fields=table`` page, ``next`` link included.
+
+    The result is cached per user in a template fragment, so it must not
+    depend on the page's own query string (``page_size``, ``cursor``) or
+    on the host it was requested through.
+    """
+    paginator = TransactionCursorPagination()
+    queryset = Transaction.objects.filter(user=request.user).values(*TRANSACTION_TABLE_FIELDS)
+    api_request = copy.copy(request)
+    api_request.GET = QueryDict()
+    page = paginator.paginate_queryset(queryset, Request(api_request))
+    # Point the cursor at the API rather than at this page.
+    paginator.base_url = '/api/transactions/?fields=table'
+    return {
+        'next': paginator.get_next_link(),
+        'results': TransactionSerializer.represent_values(page, TRANSACTION_TABLE_FIELDS),
+    }
+
+def current_month_budgets(user):
+    """Same rows as ``/api/budgets/current_month/?fields=compact``."""
+    now = timezone.now()
+    budgets = Budget.objects.filter(user=user, month=now.month, year=now.year).with_spent()
+    return BudgetSerializer(budgets, many=True, fields=BUDGET_CARD_FIELDS).data
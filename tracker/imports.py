@@ -0,0 +1,84 @@
+import csv
+from itertools import islice
+
+from django.db import transaction as db_transaction
+
+from .alerts import schedule_budget_alerts
+from .cache import bump_user_version
+from .models import Transaction, MonthlyRollup
+from .serializers import TransactionSerializer
+
+IMPORT_CHUNK_SIZE = 500
+CSV_FIELDS = ['type', 'category', 'amount', 'date', 'description']
+
+class ImportFailed(Exception):
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid rows')
+        self.errors = errors
+
+def read_csv_rows(lines):
+    """Yield dict rows from an iterable of CSV lines (``str`` or ``bytes``)."""
+    lines = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in lines)
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield {field: (row.get(field) or '').strip() for field in CSV_FIELDS if row.get(field) is not None}
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def import_transactions(user, rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate and bulk insert ``rows`` for ``user``.
+
+    Rows are validated with ``TransactionSerializer`` one chunk at a time and
+    inserted with ``bulk_create`` inside a single database transaction. If any
+    row is invalid nothing is saved and ``ImportFailed`` carries the errors,
+    keyed by 1-based row number. Rollups and budget alerts are refreshed once
+    per affected month (and expense category) instead of once per row.
+    """
+    created = 0
+    errors = []
+    months = set()
+    expense_categories = {}
+    
+    with db_transaction.atomic():
+        row_number = 0
+        for chunk in _chunks(rows, chunk_size):
+            serializer = TransactionSerializer(data=chunk, many=True)
+            if not serializer.is_valid():
+                for offset, row_errors in enumerate(serializer.errors, start=row_number + 1):
+                    if row_errors:
+                        errors.append({'row': offset, 'errors': row_errors})
+            row_number += len(chunk)
+            
+            if errors:
+                # Keep validating so every bad row is reported, but skip the
+                # inserts since the whole import is going to be rolled back.
+                continue
+            
+            objects = [Transaction(user=user, **data) for data in serializer.validated_data]
+            Transaction.objects.bulk_create(objects, batch_size=chunk_size)
+            created += len(objects)
+            
+            for obj in objects:
+                key = (obj.date.year, obj.date.month)
+                months.add(key)
+                if obj.type == 'expense':
+                    expense_categories.setdefault(key, set()).add(obj.category)
+        
+        if errors:
+            raise ImportFailed(errors)
+        
+        MonthlyRollup.objects.rebuild(user=user, months=months)
+        for (year, month), categories in expense_categories.items():
+            schedule_budget_alerts(user, year, month, categories)
+    
+    bump_user_version(user.pk)
+    return {'created': created}
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.anomalies import detect_anomalies
+from tracker.models import Transaction
+
+class Command(BaseCommand):
+    help = 'Flag unusual transactions and warm the per-user anomaly cache'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only scan this username')
+    
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User '{options['user']}' does not exist")
+            user_ids = [user.pk]
+        else:
+            user_ids = Transaction.objects.values_list('user_id', flat=True).distinct().order_by('user_id')
+        
+        users = flagged = 0
+        for user_id in user_ids:
+            users += 1
+            flagged += len(detect_anomalies(user_id))
+        self.stdout.write(self.style.SUCCESS(f'Scanned {users} users, flagged {flagged} transactions'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tracker.alerts import run_forecast_batch
+
+class Command(BaseCommand):
+    help = "Raise forecast alerts for budgets projected to exceed this month's limit"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Users forecast per batch of queries')
+        parser.add_argument('--date', help='Forecast as of this YYYY-MM-DD date instead of today')
+    
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = parse_date(options['date'])
+            except ValueError:
+                today = None
+            if today is None:
+                raise CommandError('--date must use the YYYY-MM-DD format')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        
+        result = run_forecast_batch(today=today, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecast budgets for {result['users']} users, created {result['alerts']} alerts"
+        ))
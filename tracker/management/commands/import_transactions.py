@@ -0,0 +1,40 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.imports import IMPORT_CHUNK_SIZE, ImportFailed, import_transactions, read_csv_rows
+
+class Command(BaseCommand):
+    help = 'Import transactions for a user from a CSV or JSON file'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"User '{options['username']}' does not exist")
+        
+        file_format = options['format'] or ('json' if options['path'].endswith('.json') else 'csv')
+        
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as handle:
+                if file_format == 'json':
+                    rows = json.load(handle)
+                    if not isinstance(rows, list):
+                        raise CommandError('Expected a JSON array of transactions')
+                else:
+                    rows = read_csv_rows(handle)
+                result = import_transactions(user, rows, chunk_size=options['chunk_size'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        except ImportFailed as exc:
+            for error in exc.errors:
+                self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+            raise CommandError(f'Import aborted: {len(exc.errors)} invalid rows, nothing was saved')
+        
+        self.stdout.write(self.style.SUCCESS(f"Imported {result['created']} transactions"))
@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.models import MonthlyRollup
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly rollup table from raw transactions'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild rollups for this username')
+    
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User '{options['user']}' does not exist")
+        
+        count = MonthlyRollup.objects.rebuild(user=user)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} rollup rows'))
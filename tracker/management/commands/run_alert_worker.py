@@ -0,0 +1,41 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracker.alerts import process_alert_jobs
+
+logger = logging.getLogger('tracker.alerts')
+
+class Command(BaseCommand):
+    help = 'Evaluate queued budget alert jobs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=100)
+    
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                try:
+                    processed = process_alert_jobs(batch_size=options['batch_size'])
+                except Exception:
+                    # Keep serving the queue (e.g. through a database
+                    # restart) rather than exiting into a crash loop.
+                    logger.exception('Processing budget alert jobs failed')
+                    if options['once']:
+                        raise
+                    time.sleep(options['interval'])
+                    continue
+                total += processed
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} alert jobs'))
@@ -0,0 +1,71 @@
+import json
+import platform
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from tracker.benchmarks import BENCHMARK_ENDPOINTS, benchmark_serialization, run_benchmarks
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Command(BaseCommand):
+    help = 'Time the main API endpoints at several data sizes and print a JSON report'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000', help='Comma separated transactions per user')
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Endpoint to time (repeatable)')
+        parser.add_argument('--use-cache', action='store_true', help='Measure warm per-user cache hits')
+        parser.add_argument('--output', help='Write the report to this file instead of stdout')
+        parser.add_argument('--keep-db', action='store_true', help='Keep the throwaway benchmark database')
+        parser.add_argument('--serialization-rows', type=int, default=0,
+                            help='Also compare stock vs fast list rendering for this many rows')
+    
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        
+        # Benchmarks run against a throwaway test database so the seeded rows
+        # never touch real data.
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keep_db'])
+        try:
+            results = run_benchmarks(
+                sizes,
+                users=options['users'],
+                iterations=options['iterations'],
+                endpoints=options['endpoints'] or BENCHMARK_ENDPOINTS,
+                use_cache=options['use_cache']
+            )
+            serialization = None
+            if options['serialization_rows']:
+                serialization = benchmark_serialization(options['serialization_rows'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keep_db'])
+            teardown_test_environment()
+        
+        report = json.dumps({
+            'commit': _git_commit(),
+            'generated_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'results': results,
+            'serialization': serialization
+        }, indent=2)
+        
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(report + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}"))
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tracker.recurring import MATERIALIZE_BATCH_SIZE, materialize_recurring
+
+class Command(BaseCommand):
+    help = 'Create the transactions of every recurring rule that is due'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Materialize occurrences up to this YYYY-MM-DD date instead of today')
+        parser.add_argument('--batch-size', type=int, default=MATERIALIZE_BATCH_SIZE)
+    
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = parse_date(options['date'])
+            except ValueError:
+                today = None
+            if today is None:
+                raise CommandError('--date must use the YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        
+        result = materialize_recurring(today=today, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} transactions from {result['rules']} recurring rules"
+        ))
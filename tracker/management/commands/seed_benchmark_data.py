@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from tracker.benchmarks import seed_benchmark_data
+
+class Command(BaseCommand):
+    help = 'Generate deterministic benchmark users, transactions and budgets'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=1000, help='Transactions per user')
+        parser.add_argument('--months', type=int, default=12)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--end-date', type=parse_date, help='Last day of generated data (YYYY-MM-DD)')
+    
+    def handle(self, *args, **options):
+        users = seed_benchmark_data(
+            options['users'],
+            options['transactions'],
+            months=options['months'],
+            seed=options['seed'],
+            end_date=options['end_date']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} users with {options['transactions']} transactions each"
+        ))
@@ -1,6 +1,21 @@
+import json
+import logging
+import random
+import time
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.middleware.csrf import CsrfViewMiddleware
 from django.utils.deprecation import MiddlewareMixin
 
+from finance_tracker.db.routers import stick_to_primary
+
+request_logger = logging.getLogger('tracker.requests')
+slow_query_logger = logging.getLogger('tracker.slow_queries')
+
 class CustomCsrfMiddleware(MiddlewareMixin):
     def process_request(self, request):
         if request.method in ['POST', 'PUT', 'DELETE', 'PATCH']:
@@ -8,3 +23,103 @@ class CustomCsrfMiddleware(MiddlewareMixin):
             if token:
                 request.META['CSRF_COOKIE'] = token
         return None
+
+class QueryMetrics:
+    """``execute_wrapper`` that counts queries and DB time for one request."""
+    
+    def __init__(self, request):
+        self.request = request
+        self.count = 0
+        self.duration = 0.0
+        self.slow_threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.sample_rate = settings.SLOW_QUERY_SAMPLE_RATE
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slow_threshold and random.random() < self.sample_rate:
+                self.log_slow_query(sql, params, elapsed, context)
+    
+    def log_slow_query(self, sql, params, elapsed, context):
+        base_dir = str(settings.BASE_DIR)
+        stack = [
+            f'{frame.filename}:{frame.lineno} in {frame.name}'
+            for frame in traceback.extract_stack()
+            if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+            and frame.filename != __file__
+        ]
+        slow_query_logger.warning(json.dumps({
+            'path': self.request.path,
+            'method': self.request.method,
+            'database': context['connection'].alias,
+            'duration_ms': round(elapsed * 1000, 2),
+            'sql': sql,
+            'params': repr(params)[:500],
+            'stack': stack[-settings.SLOW_QUERY_STACK_DEPTH:]
+        }))
+
+class QueryMetricsMiddleware:
+    """Count queries and DB time per request.
+
+    Adds a ``Server-Timing`` header and a structured log line, and logs a
+    sample of slow queries with their SQL and call site. When
+    ``QUERY_METRICS_ENABLED`` is off the middleware removes itself from the
+    chain at startup so it costs nothing.
+    """
+    
+    def __init__(self, get_response):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        metrics = QueryMetrics(request)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+        
+        db_ms = round(metrics.duration * 1000, 2)
+        total_ms = round(total * 1000, 2)
+        
+        if settings.QUERY_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms};desc="{metrics.count} queries", '
+                f'app;dur={round(total_ms - db_ms, 2)}, total;dur={total_ms}'
+            )
+        
+        request_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.count,
+            'db_ms': db_ms,
+            'total_ms': total_ms
+        }))
+        return response
+
+class ReplicaStickinessMiddleware:
+    """Pin a session to primary for a short while after it writes.
+
+    Replica-routed reads check the session (see ``replica_alias_for``) so
+    a user never reads from a replica that has not caught up with their
+    own change. Unused when no replica is configured.
+    """
+    
+    def __init__(self, get_response):
+        if settings.DATABASE_REPLICA_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            stick_to_primary(request)
+        return response
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+def populate_rollups(apps, schema_editor):
+    Transaction = apps.get_model('tracker', 'Transaction')
+    MonthlyRollup = apps.get_model('tracker', 'MonthlyRollup')
+    totals = Transaction.objects.annotate(
+        year=ExtractYear('date'), month=ExtractMonth('date')
+    ).values('user_id', 'year', 'month', 'type', 'category').annotate(
+        total=Sum('amount'), count=Count('id')
+    ).order_by()
+    MonthlyRollup.objects.bulk_create([MonthlyRollup(**row) for row in totals], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('category', models.CharField(choices=[('food', 'Food & Dining'), ('transport', 'Transport'), ('utilities', 'Utilities'), ('entertainment', 'Entertainment'), ('shopping', 'Shopping'), ('health', 'Health & Fitness'), ('education', 'Education'), ('salary', 'Salary'), ('freelance', 'Freelance'), ('investment', 'Investment'), ('other', 'Other')], max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-year', '-month', 'type', 'category'],
+            },
+        ),
+        migrations.RenameIndex(
+            model_name='transaction',
+            new_name='tracker_tra_user_id_b536e2_idx',
+            old_name='tracker_tran_user_id_date_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='transaction',
+            new_name='tracker_tra_user_id_177eba_idx',
+            old_name='tracker_tran_user_id_type_idx',
+        ),
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlyrollup',
+            unique_together={('user', 'year', 'month', 'type', 'category')},
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
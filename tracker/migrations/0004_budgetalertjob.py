@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0003_transaction_category_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetAlertJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('category', models.CharField(choices=[('food', 'Food & Dining'), ('transport', 'Transport'), ('utilities', 'Utilities'), ('entertainment', 'Entertainment'), ('shopping', 'Shopping'), ('health', 'Health & Fitness'), ('education', 'Education'), ('salary', 'Salary'), ('freelance', 'Freelance'), ('investment', 'Investment'), ('other', 'Other')], max_length=20)),
+                ('requested_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_alert_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['requested_at'],
+                'indexes': [models.Index(fields=['requested_at'], name='tracker_bud_request_28a487_idx')],
+                'unique_together': {('user', 'year', 'month', 'category')},
+            },
+        ),
+    ]
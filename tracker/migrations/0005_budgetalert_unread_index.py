@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_budgetalertjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budgetalert',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='tracker_bud_user_id_7e8663_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_budgetalert_unread_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='budgetalert',
+            name='alert_type',
+            field=models.CharField(choices=[('warning', 'Warning (75%)'), ('critical', 'Critical (90%)'), ('forecast', 'Projected to exceed')], max_length=10),
+        ),
+    ]
@@ -1,7 +1,26 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 
+from .cache import bump_user_version
+from .dates import month_range
+
+class BudgetQuerySet(models.QuerySet):
+    def with_spent(self):
+        """Annotate each budget with ``spent`` from the monthly rollup in the same query."""
+        spent = MonthlyRollup.objects.filter(
+            user=OuterRef('user'),
+            year=OuterRef('year'),
+            month=OuterRef('month'),
+            type='expense',
+            category=OuterRef('category')
+        ).values('total')[:1]
+        return self.annotate(
+            spent=Coalesce(Subquery(spent), Value(0), output_field=models.DecimalField(max_digits=12, decimal_places=2))
+        )
+
 class Budget(models.Model):
     CATEGORY_CHOICES = [
         ('food', 'Food & Dining'),
@@ -22,12 +41,68 @@ class Budget(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BudgetQuerySet.as_manager()
+    
     class Meta:
         unique_together = ('user', 'category', 'month', 'year')
         ordering = ['-year', '-month', 'category']
     
     def __str__(self):
         return f"{self.user.username} - {self.category} ({self.month}/{self.year})"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_user_version(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_user_version(self.user_id)
+        return result
+
+class TransactionQuerySet(models.QuerySet):
+    def in_month(self, year, month):
+        start, end = month_range(year, month)
+        return self.filter(date__gte=start, date__lt=end)
+    
+    def for_month(self, user, year, month):
+        return self.filter(user=user).in_month(year, month)
+    
+    # Bulk deletes and updates (e.g. the admin's "delete selected" action)
+    # skip Transaction.save/delete, so they rebuild the rollup buckets they
+    # touched instead.
+    def _rollup_months(self):
+        months = {}
+        rows = self.annotate(
+            year=ExtractYear('date'), month=ExtractMonth('date')
+        ).values_list('user_id', 'year', 'month').distinct().order_by()
+        for user_id, year, month in rows:
+            months.setdefault(user_id, set()).add((year, month))
+        return months
+    
+    def _rebuild_rollups(self, *month_maps):
+        affected = {}
+        for months in month_maps:
+            for user_id, user_months in months.items():
+                affected.setdefault(user_id, set()).update(user_months)
+        for user_id, user_months in affected.items():
+            MonthlyRollup.objects.rebuild(user=user_id, months=user_months)
+            bump_user_version(user_id)
+    
+    def delete(self):
+        with db_transaction.atomic():
+            months = self._rollup_months()
+            result = super().delete()
+            self._rebuild_rollups(months)
+        return result
+    
+    def update(self, **kwargs):
+        with db_transaction.atomic():
+            pks = list(self.values_list('pk', flat=True))
+            before = self._rollup_months()
+            result = super().update(**kwargs)
+            after = Transaction.objects.filter(pk__in=pks)._rollup_months()
+            self._rebuild_rollups(before, after)
+        return result
 
 class Transaction(models.Model):
     TRANSACTION_TYPE_CHOICES = [
@@ -55,23 +130,120 @@ class Transaction(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)])
     description = models.CharField(max_length=255, blank=True)
     date = models.DateField()
+    # Set on generated rows (e.g. ``recurring:<rule id>:<date>``) so that
+    # re-running a generator can never insert the same row twice.
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TransactionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date', '-created_at']
         indexes = [
             models.Index(fields=['user', '-date']),
             models.Index(fields=['user', 'type']),
+            models.Index(fields=['user', 'type', 'category', 'date']),
         ]
     
     def __str__(self):
         return f"{self.user.username} - {self.type} - {self.amount} ({self.date})"
+    
+    ROLLUP_FIELDS = ('user_id', 'date', 'type', 'category', 'amount')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row contributed to the rollup so that a later save
+        # or delete can subtract it without re-reading the row.
+        loaded = set(instance.__dict__)
+        if all(name in loaded for name in cls.ROLLUP_FIELDS):
+            instance._rollup_state = instance._get_rollup_state()
+        return instance
+    
+    def _get_rollup_state(self):
+        return (self.user_id, self.date.year, self.date.month, self.type, self.category, self.amount)
+    
+    def _load_rollup_state(self):
+        state = getattr(self, '_rollup_state', None)
+        if state is None and self.pk is not None:
+            row = Transaction.objects.filter(pk=self.pk).values_list(*self.ROLLUP_FIELDS).first()
+            if row:
+                user_id, date, type, category, amount = row
+                state = (user_id, date.year, date.month, type, category, amount)
+        return state
+    
+    def save(self, *args, **kwargs):
+        with db_transaction.atomic():
+            previous = None if self._state.adding else self._load_rollup_state()
+            super().save(*args, **kwargs)
+            current = self._get_rollup_state()
+            MonthlyRollup.objects.apply_change(previous, current)
+        self._rollup_state = current
+        bump_user_version(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            previous = self._load_rollup_state()
+            result = super().delete(*args, **kwargs)
+            MonthlyRollup.objects.apply_change(previous, None)
+        self._rollup_state = None
+        bump_user_version(self.user_id)
+        return result
+
+class RecurringTransaction(models.Model):
+    """A transaction that repeats on a schedule, such as salary or rent.
+
+    ``next_run`` is the date of the next occurrence still to be created.
+    Monthly and yearly rules keep ``start_date``'s day of the month, falling
+    back to the last day in shorter months.
+    """
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recurring_transactions')
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPE_CHOICES)
+    category = models.CharField(max_length=20, choices=Transaction.CATEGORY_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)])
+    description = models.CharField(max_length=255, blank=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_run = models.DateField()
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['next_run', 'id']
+        indexes = [
+            models.Index(fields=['is_active', 'next_run']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.category} {self.amount} ({self.frequency})"
+    
+    def save(self, *args, **kwargs):
+        if self.next_run is None:
+            self.next_run = self.start_date
+        super().save(*args, **kwargs)
+        bump_user_version(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_user_version(self.user_id)
+        return result
 
 class BudgetAlert(models.Model):
     ALERT_TYPE_CHOICES = [
         ('warning', 'Warning (75%)'),
         ('critical', 'Critical (90%)'),
+        ('forecast', 'Projected to exceed'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budget_alerts')
@@ -84,6 +256,135 @@ class BudgetAlert(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at']),
+        ]
     
     def __str__(self):
         return f"Alert for {self.user.username} - {self.budget.category}"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_user_version(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_user_version(self.user_id)
+        return result
+
+class MonthlyRollupManager(models.Manager):
+    def apply_change(self, previous, current):
+        """Move a transaction's contribution from ``previous`` to ``current``.
+
+        Both are ``(user_id, year, month, type, category, amount)`` tuples or
+        ``None`` for a create/delete.
+        """
+        if previous and current and previous[:5] == current[:5]:
+            if previous[5] != current[5]:
+                self._add(previous[:5], current[5] - previous[5], 0)
+            return
+        if previous:
+            self._add(previous[:5], -previous[5], -1)
+        if current:
+            self._add(current[:5], current[5], 1)
+    
+    def _add(self, key, amount, count):
+        user_id, year, month, type, category = key
+        row, created = self.get_or_create(
+            user_id=user_id, year=year, month=month, type=type, category=category,
+            defaults={'total': amount, 'count': count}
+        )
+        if not created:
+            self.filter(pk=row.pk).update(total=F('total') + amount, count=F('count') + count)
+    
+    def rebuild(self, user=None, months=None):
+        """Recompute rollup rows from raw transactions.
+
+        ``user`` limits the rebuild to one user and ``months`` to an iterable of
+        ``(year, month)`` pairs; with neither the whole table is rebuilt.
+        """
+        rollups = self.all()
+        transactions = Transaction.objects.all()
+        if user is not None:
+            rollups = rollups.filter(user=user)
+            transactions = transactions.filter(user=user)
+        if months is not None:
+            months = set(months)
+            if not months:
+                return 0
+            period = models.Q()
+            in_months = models.Q()
+            for year, month in months:
+                start, end = month_range(year, month)
+                period |= models.Q(year=year, month=month)
+                in_months |= models.Q(date__gte=start, date__lt=end)
+            rollups = rollups.filter(period)
+            transactions = transactions.filter(in_months)
+        
+        totals = transactions.annotate(
+            year=ExtractYear('date'), month=ExtractMonth('date')
+        ).values('user_id', 'year', 'month', 'type', 'category').annotate(
+            total=Sum('amount'), count=models.Count('id')
+        ).order_by()
+        
+        rows = [MonthlyRollup(**row) for row in totals]
+        with db_transaction.atomic():
+            rollups.delete()
+            self.bulk_create(rows, batch_size=500)
+        return len(rows)
+    
+    def month_totals(self, user, year, month):
+        """Return ``{'income', 'expense', 'count'}`` for one user and month."""
+        totals = {'income': 0, 'expense': 0, 'count': 0}
+        rows = self.filter(user=user, year=year, month=month).values('type').annotate(
+            total=Sum('total'), count=Sum('count')
+        ).order_by()
+        for row in rows:
+            totals[row['type']] = row['total'] or 0
+            totals['count'] += row['count'] or 0
+        return totals
+    
+    def spent(self, user, year, month, category):
+        return self.filter(
+            user=user, year=year, month=month, type='expense', category=category
+        ).values_list('total', flat=True).first() or 0
+
+class MonthlyRollup(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_rollups')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPE_CHOICES)
+    category = models.CharField(max_length=20, choices=Transaction.CATEGORY_CHOICES)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    objects = MonthlyRollupManager()
+    
+    class Meta:
+        unique_together = ('user', 'year', 'month', 'type', 'category')
+        ordering = ['-year', '-month', 'type', 'category']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.type}/{self.category} ({self.month}/{self.year}): {self.total}"
+
+class BudgetAlertJob(models.Model):
+    """A pending budget alert evaluation for one user, month and category.
+
+    Rows are unique per bucket, so a burst of writes to the same budget
+    collapses into a single job; ``requested_at`` tracks the latest request.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budget_alert_jobs')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    category = models.CharField(max_length=20, choices=Transaction.CATEGORY_CHOICES)
+    requested_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ('user', 'year', 'month', 'category')
+        ordering = ['requested_at']
+        indexes = [
+            models.Index(fields=['requested_at']),
+        ]
+    
+    def __str__(self):
+        return f"Alert job for {self.user_id} - {self.category} ({self.month}/{self.year})"
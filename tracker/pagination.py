@@ -0,0 +1,8 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+class TransactionCursorPagination(CursorPagination):
+    page_size = settings.TRANSACTION_PAGE_SIZE
+    max_page_size = settings.TRANSACTION_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    ordering = ('-date', '-created_at', '-id')
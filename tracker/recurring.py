@@ -0,0 +1,87 @@
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .alerts import schedule_budget_alerts
+from .cache import bump_user_version
+from .dates import add_months
+from .models import MonthlyRollup, RecurringTransaction, Transaction
+
+MATERIALIZE_BATCH_SIZE = 500
+
+def next_occurrence(rule, day):
+    """The occurrence of ``rule`` that follows ``day``."""
+    if rule.frequency == 'daily':
+        return day + timedelta(days=rule.interval)
+    if rule.frequency == 'weekly':
+        return day + timedelta(weeks=rule.interval)
+    months = rule.interval * (12 if rule.frequency == 'yearly' else 1)
+    year, month = add_months(day.year, day.month, months)
+    return date(year, month, min(rule.start_date.day, calendar.monthrange(year, month)[1]))
+
+def idempotency_key(rule, day):
+    return f'recurring:{rule.pk}:{day.isoformat()}'
+
+def _due_transactions(rule, today):
+    """Build the rule's unsaved transactions up to ``today`` and advance it."""
+    day = rule.next_run
+    while day <= today and (rule.end_date is None or day <= rule.end_date):
+        yield Transaction(
+            user_id=rule.user_id,
+            type=rule.type,
+            category=rule.category,
+            amount=rule.amount,
+            description=rule.description,
+            date=day,
+            idempotency_key=idempotency_key(rule, day)
+        )
+        day = next_occurrence(rule, day)
+    rule.next_run = day
+    if rule.end_date is not None and day > rule.end_date:
+        rule.is_active = False
+
+def materialize_recurring(today=None, batch_size=MATERIALIZE_BATCH_SIZE):
+    """Create every due occurrence of every active rule, for all users at once.
+
+    Occurrences are inserted with ``bulk_create`` and carry an idempotency
+    key, so a re-run (or a rule whose ``next_run`` was moved back) never
+    duplicates rows. Rollups and budget alerts are refreshed once per
+    affected user and month rather than once per generated row.
+    """
+    today = today or timezone.localdate()
+    with db_transaction.atomic():
+        rules = list(
+            RecurringTransaction.objects.filter(is_active=True, next_run__lte=today)
+            .select_related('user').select_for_update(of=('self',)).order_by('user_id', 'pk')
+        )
+        occurrences = [occurrence for rule in rules for occurrence in _due_transactions(rule, today)]
+        
+        existing = set()
+        for offset in range(0, len(occurrences), batch_size):
+            keys = [occurrence.idempotency_key for occurrence in occurrences[offset:offset + batch_size]]
+            existing.update(Transaction.objects.filter(idempotency_key__in=keys).values_list('idempotency_key', flat=True))
+        new = [occurrence for occurrence in occurrences if occurrence.idempotency_key not in existing]
+        
+        # ignore_conflicts covers a concurrent run inserting the same keys.
+        Transaction.objects.bulk_create(new, batch_size=batch_size, ignore_conflicts=True)
+        RecurringTransaction.objects.bulk_update(rules, ['next_run', 'is_active'], batch_size=batch_size)
+        
+        users = {rule.user_id: rule.user for rule in rules}
+        months = {}
+        expense_categories = {}
+        for occurrence in new:
+            key = (occurrence.date.year, occurrence.date.month)
+            months.setdefault(occurrence.user_id, set()).add(key)
+            if occurrence.type == 'expense':
+                expense_categories.setdefault((occurrence.user_id, key), set()).add(occurrence.category)
+        for user_id, user_months in months.items():
+            MonthlyRollup.objects.rebuild(user=users[user_id], months=user_months)
+        for (user_id, (year, month)), categories in expense_categories.items():
+            schedule_budget_alerts(users[user_id], year, month, categories)
+    
+    # bulk_create and bulk_update skip the models' save().
+    for user_id in users:
+        bump_user_version(user_id)
+    return {'rules': len(rules), 'created': len(new)}
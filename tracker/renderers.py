@@ -0,0 +1,61 @@
+import decimal
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class MoneyJSONEncoder(JSONEncoder):
+    """DRF's encoder, but ``Decimal`` values keep their digits as strings."""
+    
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        return super().default(obj)
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` backed by orjson when it is installed.
+
+    Output matches the stdlib renderer: compact, UTF-8, with U+2028/U+2029
+    escaped, and anything orjson cannot encode natively (``Decimal``,
+    datetimes, lazy strings) goes through ``MoneyJSONEncoder``.
+    """
+    encoder_class = MoneyJSONEncoder
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=option)
+        
+        # Same escaping as JSONRenderer so the output is safe inside <script>.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+class StreamRenderer(BaseRenderer):
+    """Content negotiation stub for actions that stream their own body.
+
+    Only error responses (validation, permissions) are rendered through it,
+    and those are rendered as JSON.
+    """
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return FastJSONRenderer().render(data, renderer_context=renderer_context)
+
+class CSVRenderer(StreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+class JSONLinesRenderer(StreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
@@ -1,19 +1,66 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Transaction, Budget, BudgetAlert
+from django.utils import timezone
+from .models import Transaction, Budget, BudgetAlert, MonthlyRollup, RecurringTransaction
+
+MONEY_FIELD = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+def format_money(value):
+    """Render an amount the same way the model serializers render ``DecimalField``s."""
+    return MONEY_FIELD.to_representation(value)
+
+class SparseFieldsMixin:
+    """Accept ``fields=[...]`` to drop every other field from the output."""
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = ['id', 'type', 'category', 'amount', 'description', 'date', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+    
+    @classmethod
+    def represent_values(cls, rows, fields=None):
+        """Build the same dicts as ``.data`` from ``values()`` rows.
+
+        Read-only fast path for large lists: skips model instantiation and the
+        per-field serializer machinery. ``fields`` narrows the output like
+        the ``fields`` argument does; rows must contain at least those keys.
+        """
+        # Same output as DateTimeField(format=ISO_8601) with the current
+        # timezone looked up once instead of per value.
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        
+        def to_datetime(value):
+            if tz is not None:
+                value = value.astimezone(tz)
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        
+        converters = {
+            'amount': format_money,
+            'date': lambda value: value.isoformat(),
+            'created_at': to_datetime,
+            'updated_at': to_datetime,
+        }
+        columns = [(name, converters.get(name)) for name in fields or cls.Meta.fields]
+        return [
+            {name: convert(row[name]) if convert else row[name] for name, convert in columns}
+            for row in rows
+        ]
 
-class BudgetSerializer(serializers.ModelSerializer):
+class BudgetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     spent_amount = serializers.SerializerMethodField()
     percentage_used = serializers.SerializerMethodField()
     
@@ -22,31 +69,29 @@ class BudgetSerializer(serializers.ModelSerializer):
         fields = ['id', 'category', 'limit', 'month', 'year', 'spent_amount', 'percentage_used', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
     
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        # The annotated amount may belong to the old category or month.
+        instance.__dict__.pop('spent', None)
+        return instance
+    
+    def _get_spent(self, obj):
+        # BudgetViewSet annotates ``spent`` for the whole list; fall back to a
+        # rollup lookup for freshly created or otherwise unannotated budgets.
+        if not hasattr(obj, 'spent'):
+            obj.spent = MonthlyRollup.objects.spent(obj.user_id, obj.year, obj.month, obj.category)
+        return obj.spent
+    
     def get_spent_amount(self, obj):
-        from django.db.models import Sum
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            type='expense',
-            category=obj.category,
-            date__month=obj.month,
-            date__year=obj.year
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        return float(spent)
+        return format_money(self._get_spent(obj))
     
     def get_percentage_used(self, obj):
-        from django.db.models import Sum
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            type='expense',
-            category=obj.category,
-            date__month=obj.month,
-            date__year=obj.year
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        spent = self._get_spent(obj)
         if obj.limit > 0:
             return float((spent / obj.limit) * 100)
         return 0
 
-class BudgetAlertSerializer(serializers.ModelSerializer):
+class BudgetAlertSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     budget_category = serializers.CharField(source='budget.category', read_only=True)
     
     class Meta:
@@ -54,6 +99,29 @@ class BudgetAlertSerializer(serializers.ModelSerializer):
         fields = ['id', 'budget_category', 'alert_type', 'spent_amount', 'percentage', 'is_read', 'created_at']
         read_only_fields = ['created_at']
 
+class RecurringTransactionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringTransaction
+        fields = [
+            'id', 'type', 'category', 'amount', 'description', 'frequency', 'interval',
+            'start_date', 'end_date', 'next_run', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['next_run', 'created_at', 'updated_at']
+    
+    def validate(self, data):
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if end_date is not None and start_date is not None and end_date < start_date:
+            raise serializers.ValidationError({'end_date': 'End date cannot be before the start date.'})
+        return data
+    
+    def update(self, instance, validated_data):
+        # A new start date restarts the schedule from there; rows that were
+        # already generated are skipped thanks to their idempotency keys.
+        if 'start_date' in validated_data and validated_data['start_date'] != instance.start_date:
+            instance.next_run = validated_data['start_date']
+        return super().update(instance, validated_data)
+
 class DashboardStatsSerializer(serializers.Serializer):
     total_income = serializers.DecimalField(max_digits=10, decimal_places=2)
     total_expenses = serializers.DecimalField(max_digits=10, decimal_places=2)
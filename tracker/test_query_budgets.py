@@ -0,0 +1,233 @@
+import difflib
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+
+from .dates import add_months
+from .models import Transaction, Budget, BudgetAlert, MonthlyRollup, RecurringTransaction
+from .recurring import materialize_recurring
+
+SMALL = 3
+LARGE = 60
+
+def build_fixture(user, size):
+    """Give ``user`` ``size`` transactions and recurring rules, and budgets and alerts per expense category."""
+    today = date.today()
+    categories = [code for code, _ in Budget.CATEGORY_CHOICES]
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user,
+            type='income' if i % 5 == 0 else 'expense',
+            category='salary' if i % 5 == 0 else categories[i % len(categories)],
+            amount=Decimal('10.00') + i,
+            date=today - timedelta(days=i % 28),
+            description=f'Row {i}'
+        )
+        for i in range(size)
+    ])
+    MonthlyRollup.objects.rebuild(user=user)
+    # Daily rules with today's occurrence due.
+    RecurringTransaction.objects.bulk_create([
+        RecurringTransaction(
+            user=user,
+            type='expense',
+            category=categories[i % len(categories)],
+            amount=Decimal('5.00') + i,
+            frequency='daily',
+            start_date=today,
+            next_run=today
+        )
+        for i in range(size)
+    ])
+    
+    Budget.objects.bulk_create([
+        Budget(user=user, category=category, limit=100, month=today.month, year=today.year)
+        for category in categories[:max(1, min(size, len(categories)))]
+    ])
+    budgets = list(Budget.objects.filter(user=user))
+    BudgetAlert.objects.bulk_create([
+        BudgetAlert(user=user, budget=budget, alert_type='warning', spent_amount=80, percentage=80)
+        for budget in budgets
+    ])
+
+class QueryBudgetTestCase(TestCase):
+    """Every API endpoint must run in a fixed number of queries.
+
+    Each check runs the same request against a small and a large data set and
+    asserts that both stay under the ceiling and issue the same number of
+    queries, so per-row queries (N+1) fail here before they reach production.
+    """
+    
+    def setUp(self):
+        self.small_user = User.objects.create_user(username='small', password='testpass123')
+        self.large_user = User.objects.create_user(username='large', password='testpass123')
+        build_fixture(self.small_user, SMALL)
+        build_fixture(self.large_user, LARGE)
+    
+    def client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+    
+    def capture(self, user, method, path, data=None, status=None):
+        client = self.client_for(user)
+        cache.clear()
+        ids = self.ids(user)
+        path = path.format(**ids)
+        if data is not None:
+            data = {key: value.format(**ids) if isinstance(value, str) else value for key, value in data.items()}
+        with CaptureQueriesContext(connection) as queries:
+            if data is None:
+                response = getattr(client, method)(path)
+            else:
+                response = getattr(client, method)(path, json.dumps(data), content_type='application/json')
+        if status is not None:
+            body = b'<stream>' if response.streaming else response.content[:500]
+            self.assertEqual(response.status_code, status, f'{method.upper()} {path}: {body}')
+        return [query['sql'] for query in queries.captured_queries]
+    
+    def ids(self, user):
+        return {
+            'transaction': Transaction.objects.filter(user=user).values_list('pk', flat=True).first(),
+            'budget': Budget.objects.filter(user=user).values_list('pk', flat=True).first(),
+            'budget_category': Budget.objects.filter(user=user).values_list('category', flat=True).first(),
+            'alert': BudgetAlert.objects.filter(user=user).values_list('pk', flat=True).first(),
+            'recurring': RecurringTransaction.objects.filter(user=user).values_list('pk', flat=True).first(),
+        }
+    
+    def assertQueryBudget(self, path, ceiling, method='get', data=None, status=200, constant=True):
+        small = self.capture(self.small_user, method, path, data, status)
+        large = self.capture(self.large_user, method, path, data, status)
+        self.assertQueryCounts(f'{method.upper()} {path}', small, large, ceiling, constant)
+    
+    def assertQueryCounts(self, label, small, large, ceiling, constant=True):
+        for size, queries in (('small', small), ('large', large)):
+            if len(queries) > ceiling:
+                self.fail(
+                    f'{label} ran {len(queries)} queries with the {size} fixture '
+                    f'(ceiling {ceiling}):\n' + '\n'.join(f'{i}. {sql}' for i, sql in enumerate(queries, 1))
+                )
+        if constant and len(small) != len(large):
+            diff = '\n'.join(difflib.unified_diff(
+                small, large, f'{SMALL} rows', f'{LARGE} rows', lineterm=''
+            ))
+            self.fail(f'{label} query count grows with data ({len(small)} -> {len(large)}):\n{diff}')
+    
+    def test_transaction_endpoints(self):
+        self.assertQueryBudget('/api/transactions/', 3)
+        self.assertQueryBudget('/api/transactions/{transaction}/', 3)
+        self.assertQueryBudget('/api/transactions/by_category/', 3)
+        self.assertQueryBudget('/api/transactions/monthly_summary/', 3)
+        self.assertQueryBudget('/api/transactions/export/?format=csv', 3)
+        self.assertQueryBudget('/api/transactions/anomalies/', 3)
+    
+    def test_transaction_writes(self):
+        payload = {'type': 'expense', 'category': 'food', 'amount': '5.00', 'date': date.today().isoformat()}
+        # Writes only get a ceiling: creating a rollup bucket costs a couple of
+        # queries more than updating an existing one.
+        self.assertQueryBudget('/api/transactions/', 13, method='post', data=payload, status=201, constant=False)
+        self.assertQueryBudget('/api/transactions/{transaction}/', 12, method='put', data=payload, constant=False)
+        self.assertQueryBudget('/api/transactions/{transaction}/', 8, method='delete', status=204, constant=False)
+    
+    def bulk_payload(self, months, rows):
+        """``rows`` expense rows spread over ``months`` months and every category."""
+        today = date.today()
+        categories = [code for code, _ in Budget.CATEGORY_CHOICES]
+        payload = []
+        for i in range(rows):
+            year, month = add_months(today.year, today.month, -(i % months))
+            payload.append({
+                'type': 'expense',
+                'category': categories[i % len(categories)],
+                'amount': '1.00',
+                'date': date(year, month, 1).isoformat()
+            })
+        return payload
+    
+    def bulk_queries(self, user, payload):
+        client = self.client_for(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/transactions/bulk/', json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content[:500])
+        return [query['sql'] for query in queries.captured_queries]
+    
+    def test_bulk_import(self):
+        # The same (month, category) buckets cost the same however many rows
+        # fill them (on SQLite, up to one insert batch).
+        self.assertQueryCounts(
+            'POST /api/transactions/bulk/',
+            self.bulk_queries(self.small_user, self.bulk_payload(1, SMALL)),
+            self.bulk_queries(self.large_user, self.bulk_payload(1, LARGE)),
+            11
+        )
+        # Each further month adds at most one query (its alert jobs).
+        one_month = self.bulk_queries(self.small_user, self.bulk_payload(1, 24))
+        twelve_months = self.bulk_queries(self.large_user, self.bulk_payload(12, 24))
+        self.assertLessEqual(len(twelve_months), len(one_month) + 11)
+    
+    def test_budget_writes(self):
+        today = date.today()
+        payload = {'category': '{budget_category}', 'limit': '150.00', 'month': today.month, 'year': today.year}
+        self.assertQueryBudget('/api/budgets/{budget}/', 5, method='put', data=payload)
+        self.assertQueryBudget('/api/budgets/{budget}/', 5, method='delete', status=204)
+        self.assertQueryBudget('/api/budgets/', 4, method='post', data={**payload, 'year': today.year + 1}, status=201)
+    
+    def test_recurring_writes(self):
+        payload = {'type': 'expense', 'category': 'utilities', 'amount': '40.00', 'frequency': 'monthly',
+                   'start_date': (date.today() + timedelta(days=1)).isoformat()}
+        self.assertQueryBudget('/api/recurring/', 3, method='post', data=payload, status=201)
+        self.assertQueryBudget('/api/recurring/{recurring}/', 4, method='put', data=payload)
+        self.assertQueryBudget('/api/recurring/{recurring}/', 4, method='delete', status=204)
+    
+    def test_budget_endpoints(self):
+        self.assertQueryBudget('/api/budgets/', 3)
+        self.assertQueryBudget('/api/budgets/{budget}/', 3)
+        self.assertQueryBudget('/api/budgets/current_month/', 3)
+        self.assertQueryBudget('/api/budgets/forecast/', 4)
+    
+    def test_recurring_endpoints(self):
+        self.assertQueryBudget('/api/recurring/', 3)
+        self.assertQueryBudget('/api/recurring/{recurring}/', 3)
+    
+    def test_materialize_recurring(self):
+        # Runs for every user at once, so time one user's rules at a time.
+        def run(user):
+            RecurringTransaction.objects.filter(user=user).update(is_active=True)
+            with CaptureQueriesContext(connection) as queries:
+                result = materialize_recurring()
+            self.assertEqual(result['rules'], RecurringTransaction.objects.filter(user=user).count())
+            return [query['sql'] for query in queries.captured_queries]
+        
+        RecurringTransaction.objects.update(is_active=False)
+        self.assertQueryCounts('materialize_recurring()', run(self.small_user), run(self.large_user), 12)
+    
+    def test_alert_endpoints(self):
+        self.assertQueryBudget('/api/alerts/', 3)
+        self.assertQueryBudget('/api/alerts/unread/', 3)
+    
+    def test_alert_detail_and_mark_as_read(self):
+        self.assertQueryBudget('/api/alerts/{alert}/', 3)
+        self.assertQueryBudget('/api/alerts/mark_as_read/', 3, method='post', data={'alert_id': '{alert}'})
+        self.assertQueryBudget('/api/alerts/mark_as_read/', 3, method='post', data={'all': True})
+    
+    def test_dashboard_endpoints(self):
+        self.assertQueryBudget('/api/dashboard/stats/', 4)
+        self.assertQueryBudget('/api/dashboard/chart_data/', 3)
+        self.assertQueryBudget('/api/dashboard/overview/', 6)
+        self.assertQueryBudget('/api/dashboard/trends/?months=12', 3)
+        self.assertQueryBudget('/api/dashboard/trends/?months=3&granularity=week', 3)
+    
+    def test_cache_stats(self):
+        User.objects.update(is_staff=True)
+        self.assertQueryBudget('/api/dashboard/cache_stats/', 2)
+    
+    def test_user_endpoints(self):
+        self.assertQueryBudget('/api/users/profile/', 2)
+        self.assertQueryBudget('/api/auth/profile/', 2)
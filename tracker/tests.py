@@ -1,11 +1,44 @@
-from django.test import TestCase, Client
+from django.conf import settings
+from django.test import TestCase, Client, override_settings
+from django.test import TransactionTestCase as CommittingTestCase
 from django.contrib.auth.models import User
-from .models import Transaction, Budget, BudgetAlert
-from datetime import date
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import F
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.test.utils import CaptureQueriesContext
+from psycopg2.pool import PoolError
+from finance_tracker.db import database_from_url
+from finance_tracker.db.postgresql_pool import base as pool_backend
+from finance_tracker.db.routers import STICKY_SESSION_KEY, ReplicaRouter, read_from
+from . import alerts
+from .alerts import enqueue_budget_alerts, process_alert_jobs, run_forecast_batch
+from .anomalies import find_anomalies
+from .benchmarks import run_benchmarks
+from .authentication import USER_KEY
+from .cache import get_user_version
+from .checks import check_token_revocation_cache
+from .forecasting import forecast_budgets
+from .models import Transaction, Budget, BudgetAlert, BudgetAlertJob, MonthlyRollup, RecurringTransaction
+from .recurring import materialize_recurring
+from .serializers import TransactionSerializer
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+import csv
+import gzip
 import json
+import time
+import tracemalloc
+import unittest
+from unittest import mock
 
 class TransactionTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', password='testpass123')
         self.client = Client()
         self.client.login(username='testuser', password='testpass123')
@@ -35,10 +68,260 @@ class TransactionTestCase(TestCase):
         response = self.client.get('/api/transactions/')
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
-        self.assertEqual(len(data), 1)
+        self.assertEqual(len(data['results']), 1)
+    
+    @override_settings(USER_CACHE_ENABLED=True)
+    def test_conditional_get_and_if_match(self):
+        transaction = Transaction.objects.create(
+            user=self.user, type='expense', category='food', amount=10, date=date.today()
+        )
+        
+        response = self.client.get('/api/transactions/')
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/transactions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in queries.captured_queries if 'tracker_transaction' in q['sql']])
+        
+        detail = f'/api/transactions/{transaction.pk}/'
+        detail_etag = self.client.get(detail)['ETag']
+        payload = {'type': 'expense', 'category': 'food', 'amount': '12.00', 'date': str(date.today())}
+        response = self.client.put(detail, payload, content_type='application/json', HTTP_IF_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], detail_etag)
+        
+        response = self.client.put(detail, payload, content_type='application/json', HTTP_IF_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.get('/api/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    @override_settings(USER_CACHE_ENABLED=False)
+    def test_no_etags_without_user_cache(self):
+        response = self.client.get('/api/transactions/')
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get('/api/transactions/', HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+    
+    def test_list_fast_path_matches_serializer(self):
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount='1234.50',
+                                   date=date(2024, 1, 15), description='Groceries \u2028')
+        Transaction.objects.create(user=self.user, type='income', category='salary', amount=3000, date=date(2024, 1, 1))
+        
+        response = self.client.get('/api/transactions/')
+        expected = TransactionSerializer(Transaction.objects.order_by('-date', '-created_at', '-id'), many=True).data
+        self.assertEqual(json.loads(response.content)['results'], json.loads(json.dumps(expected)))
+        self.assertEqual(json.loads(response.content)['results'][0]['amount'], '1234.50')
+        self.assertIn(b'\\u2028', response.content)
+    
+    def test_sparse_fieldsets_narrow_sql_and_output(self):
+        for day in range(1, 4):
+            Transaction.objects.create(user=self.user, type='expense', category='food', amount=day,
+                                       date=date(2024, 1, day), description='Lunch')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/transactions/?fields=amount,id&page_size=2')
+        data = json.loads(response.content)
+        self.assertEqual(data['results'], [{'id': data['results'][0]['id'], 'amount': '3.00'},
+                                           {'id': data['results'][1]['id'], 'amount': '2.00'}])
+        select = [q['sql'] for q in queries.captured_queries if 'FROM "tracker_transaction"' in q['sql']][0]
+        self.assertNotIn('description', select.split('FROM')[0])
+        self.assertEqual(json.loads(self.client.get(data['next']).content)['results'][0]['amount'], '1.00')
+        
+        response = self.client.get('/api/transactions/?fields=compact')
+        self.assertEqual(list(json.loads(response.content)['results'][0]),
+                         ['id', 'type', 'category', 'amount', 'date'])
+        
+        transaction = Transaction.objects.first()
+        response = self.client.get(f'/api/transactions/{transaction.pk}/?fields=description')
+        self.assertEqual(json.loads(response.content), {'description': 'Lunch'})
+        
+        response = self.client.get('/api/transactions/?fields=amount,user')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown field(s): user.', json.loads(response.content)['fields'])
+    
+    def test_transactions_cursor_pagination_with_filters(self):
+        for day in range(1, 8):
+            Transaction.objects.create(
+                user=self.user,
+                type='expense',
+                category='food' if day % 2 else 'transport',
+                amount=10.00,
+                date=date(2024, 1, day)
+            )
+        
+        seen = []
+        url = '/api/transactions/?category=food&from=2024-01-02&page_size=2'
+        while url:
+            data = json.loads(self.client.get(url).content)
+            self.assertLessEqual(len(data['results']), 2)
+            seen.extend(t['date'] for t in data['results'])
+            url = data['next']
+        
+        self.assertEqual(seen, ['2024-01-07', '2024-01-05', '2024-01-03'])
+        
+        response = self.client.get('/api/transactions/?from=2024-02-30')
+        self.assertEqual(response.status_code, 400)
+
+    def test_for_month_uses_date_range(self):
+        for day in [date(2023, 11, 30), date(2023, 12, 1), date(2023, 12, 31), date(2024, 1, 1)]:
+            Transaction.objects.create(
+                user=self.user,
+                type='expense',
+                category='food',
+                amount=10.00,
+                date=day
+            )
+        
+        december = Transaction.objects.for_month(self.user, 2023, 12)
+        self.assertEqual(december.count(), 2)
+        self.assertNotIn('django_date_extract', str(december.query))
+        
+        response = self.client.get('/api/transactions/by_category/?month=12&year=2023&category=food')
+        self.assertEqual(len(json.loads(response.content)), 2)
+        
+        for path in ['/api/transactions/by_category/', '/api/transactions/monthly_summary/', '/api/dashboard/chart_data/']:
+            for query in ['?month=13', '?month=0', '?month=june', '?month=1&year=10000']:
+                response = self.client.get(path + query)
+                self.assertEqual(response.status_code, 400, path + query)
+
+    def test_bulk_import_json_updates_rollups_and_alerts_once(self):
+        budget = Budget.objects.create(user=self.user, category='food', limit=100, month=1, year=2024)
+        rows = [
+            {'type': 'expense', 'category': 'food', 'amount': '30.00', 'date': '2024-01-%02d' % day}
+            for day in range(1, 4)
+        ]
+        
+        response = self.client.post('/api/transactions/bulk/', rows, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['created'], 3)
+        self.assertEqual(MonthlyRollup.objects.spent(self.user, 2024, 1, 'food'), Decimal('90.00'))
+        self.assertEqual(BudgetAlertJob.objects.count(), 1)
+        process_alert_jobs()
+        self.assertEqual(list(budget.alerts.values_list('alert_type', flat=True)), ['critical'])
+    
+    def test_bulk_import_csv_reports_row_errors_and_saves_nothing(self):
+        body = (
+            'type,category,amount,date,description\n'
+            'expense,food,12.50,2024-01-05,Lunch\n'
+            'expense,food,abc,2024-01-06,\n'
+            'income,salary,3000,2024-13-01,\n'
+        )
+        
+        response = self.client.post('/api/transactions/bulk/', body, content_type='text/csv')
+        
+        self.assertEqual(response.status_code, 400)
+        errors = json.loads(response.content)['errors']
+        self.assertEqual([error['row'] for error in errors], [2, 3])
+        self.assertEqual(Transaction.objects.count(), 0)
+        
+        response = self.client.post('/api/transactions/bulk/', body.rsplit('\n', 3)[0] + '\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Transaction.objects.get().description, 'Lunch')
+
+    def test_export_streams_csv_and_jsonl(self):
+        for day, category in [(1, 'food'), (2, 'transport'), (3, 'food')]:
+            Transaction.objects.create(
+                user=self.user,
+                type='expense',
+                category=category,
+                amount=10.50,
+                date=date(2024, 1, day),
+                description='Item, "quoted"'
+            )
+        
+        response = self.client.get('/api/transactions/export/?format=csv&from=2024-01-02')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['id', 'date', 'type', 'category', 'amount', 'description'])
+        self.assertEqual([row[1] for row in rows[1:]], ['2024-01-02', '2024-01-03'])
+        self.assertEqual(rows[1][5], 'Item, "quoted"')
+        
+        response = self.client.get('/api/transactions/export/?format=jsonl&category=food', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual([json.loads(line)['amount'] for line in lines], ['10.50', '10.50'])
+    
+    def test_export_memory_stays_flat_for_large_history(self):
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user,
+                type='expense',
+                category='food',
+                amount=Decimal('12.34'),
+                date=date(2020, 1, 1) + timedelta(days=i % 1500),
+                description='Generated row %d' % i
+            )
+            for i in range(20000)
+        ])
+        
+        response = self.client.get('/api/transactions/export/?format=csv')
+        tracemalloc.start()
+        try:
+            line_count = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        self.assertEqual(line_count, 20001)
+        self.assertLess(peak, 4 * 1024 * 1024)
+    
+    @override_settings(USER_CACHE_ENABLED=True)
+    def test_anomalies_flag_outliers_and_duplicates(self):
+        rows = [('food', amount, date(2024, 1, day)) for day, amount in enumerate([10, 11, 12, 13, 12, 11, 500], 1)]
+        rows += [('transport', 5, date(2024, 1, 20)), ('transport', 5, date(2024, 1, 20))]
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, type='expense', category=category, amount=amount, date=day)
+            for category, amount, day in rows
+        ])
+        outlier = Transaction.objects.get(amount=500)
+        
+        response = self.client.get('/api/transactions/anomalies/')
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['anomalies'][0], {
+            'id': data['anomalies'][0]['id'],
+            'date': '2024-01-20',
+            'type': 'expense',
+            'category': 'transport',
+            'amount': '5.00',
+            'reasons': ['duplicate'],
+            'score': 0.0,
+            'category_median': '5.00',
+        })
+        self.assertEqual(data['anomalies'][2]['id'], outlier.pk)
+        self.assertEqual(data['anomalies'][2]['reasons'], ['outlier'])
+        self.assertEqual(data['anomalies'][2]['score'], 329.16)
+        self.assertEqual(data['anomalies'][2]['category_median'], '12.00')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/transactions/anomalies/?reason=outlier')
+        self.assertEqual(json.loads(response.content)['count'], 1)
+        self.assertFalse([q for q in queries.captured_queries if 'tracker_transaction' in q['sql']])
+        
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount=500, date=date(2024, 1, 7))
+        out = StringIO()
+        call_command('detect_anomalies', stdout=out)
+        self.assertIn('flagged 4 transactions', out.getvalue())
+        response = self.client.get('/api/transactions/anomalies/?reason=duplicate')
+        self.assertEqual(json.loads(response.content)['count'], 4)
+        
+        # Without the user cache every request rescans the history.
+        with override_settings(USER_CACHE_ENABLED=False), CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/transactions/anomalies/')
+        self.assertTrue([q for q in queries.captured_queries if 'tracker_transaction' in q['sql']])
+    
+    def test_anomalies_when_most_amounts_repeat(self):
+        # Ten identical amounts make the category's MAD 0.
+        days = [date(2024, 1, day) for day in range(1, 12)]
+        results = find_anomalies(range(11), days, ['expense'] * 11, ['food'] * 11, [50] * 10 + [5000])
+        self.assertEqual([(index, reasons) for index, reasons, _, _ in results], [(10, ['outlier'])])
+        self.assertGreater(results[0][2], settings.ANOMALY_THRESHOLD)
+        self.assertEqual(find_anomalies(range(11), days, ['expense'] * 11, ['food'] * 11, [50] * 11), [])
 
 class BudgetTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', password='testpass123')
         self.client = Client()
         self.client.login(username='testuser', password='testpass123')
@@ -63,20 +346,232 @@ class BudgetTestCase(TestCase):
             year=2024
         )
         
+        # Alerts are raised for writes made through the API, by the worker.
+        response = self.client.post('/api/transactions/', {
+            'type': 'expense',
+            'category': 'food',
+            'amount': 95.00,
+            'date': '2024-01-15'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        process_alert_jobs()
+        
+        self.assertEqual(BudgetAlert.objects.count(), 1)
+        alert = BudgetAlert.objects.first()
+        self.assertEqual(alert.alert_type, 'critical')
+
+    def test_budget_list_query_count_is_constant(self):
+        def list_budgets():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/budgets/')
+            self.assertEqual(response.status_code, 200)
+            return len(queries), json.loads(response.content)
+        
+        Budget.objects.create(user=self.user, category='food', limit=100, month=1, year=2024)
         Transaction.objects.create(
             user=self.user,
             type='expense',
             category='food',
-            amount=95.00,
+            amount=80.00,
             date=date(2024, 1, 15)
         )
+        single_count, data = list_budgets()
+        self.assertEqual(data[0]['spent_amount'], '80.00')
+        self.assertEqual(data[0]['percentage_used'], 80.0)
         
-        self.assertEqual(BudgetAlert.objects.count(), 1)
-        alert = BudgetAlert.objects.first()
-        self.assertEqual(alert.alert_type, 'critical')
+        for category in ['transport', 'utilities', 'entertainment', 'shopping', 'health']:
+            Budget.objects.create(user=self.user, category=category, limit=100, month=1, year=2024)
+        many_count, data = list_budgets()
+        
+        self.assertEqual(len(data), 6)
+        self.assertEqual(single_count, many_count)
+
+    def test_alert_jobs_coalesce_bursts_of_writes(self):
+        budget = Budget.objects.create(user=self.user, category='food', limit=100, month=1, year=2024)
+        for amount in [40.00, 20.00, 20.00]:
+            response = self.client.post('/api/transactions/', {
+                'type': 'expense',
+                'category': 'food',
+                'amount': amount,
+                'date': '2024-01-15'
+            }, content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+        
+        self.assertEqual(BudgetAlertJob.objects.count(), 1)
+        self.assertFalse(budget.alerts.exists())
+        
+        call_command('run_alert_worker', '--once', stdout=StringIO())
+        
+        self.assertEqual(BudgetAlertJob.objects.count(), 0)
+        alert = budget.alerts.get()
+        self.assertEqual(alert.alert_type, 'warning')
+        self.assertEqual(alert.spent_amount, Decimal('80.00'))
+    
+    def test_enqueue_upserts_jobs_in_one_query(self):
+        enqueue_budget_alerts(self.user, 2024, 1, ['food'])
+        first = BudgetAlertJob.objects.get().requested_at
+        with self.assertNumQueries(1):
+            enqueue_budget_alerts(self.user, 2024, 1, ['food', 'transport'])
+        self.assertEqual(BudgetAlertJob.objects.count(), 2)
+        self.assertGreater(BudgetAlertJob.objects.get(category='food').requested_at, first)
+    
+    def test_alert_worker_survives_bad_buckets(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        # 5000% of the limit, beyond what BudgetAlert.percentage can hold.
+        overspent = Budget.objects.create(user=self.user, category='food', limit=10, month=1, year=2024)
+        normal = Budget.objects.create(user=other, category='food', limit=100, month=1, year=2024)
+        for user, amount in [(self.user, 500), (other, 95)]:
+            Transaction.objects.create(user=user, type='expense', category='food', amount=amount, date=date(2024, 1, 15))
+            enqueue_budget_alerts(user, 2024, 1, ['food'])
+        
+        call_command('run_alert_worker', '--once', stdout=StringIO())
+        self.assertEqual(overspent.alerts.get().percentage, Decimal('999.99'))
+        self.assertEqual(normal.alerts.get().alert_type, 'critical')
+        self.assertEqual(BudgetAlertJob.objects.count(), 0)
+        
+        BudgetAlert.objects.all().delete()
+        for user in (self.user, other):
+            enqueue_budget_alerts(user, 2024, 1, ['food'])
+        create = alerts.create_budget_alert
+        
+        def fail_for_overspent(budget, spent):
+            if budget.pk == overspent.pk:
+                raise ValueError('broken bucket')
+            create(budget, spent)
+        
+        with mock.patch('tracker.alerts.create_budget_alert', fail_for_overspent), \
+                self.assertLogs('tracker.alerts', 'ERROR'):
+            call_command('run_alert_worker', '--once', stdout=StringIO())
+        self.assertFalse(overspent.alerts.exists())
+        self.assertEqual(normal.alerts.get().alert_type, 'critical')
+        self.assertEqual(BudgetAlertJob.objects.count(), 0)
+
+    def test_budget_and_alert_projections(self):
+        budget = Budget.objects.create(user=self.user, category='food', limit=100,
+                                       month=date.today().month, year=date.today().year)
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount=40, date=date.today())
+        BudgetAlert.objects.create(user=self.user, budget=budget, alert_type='warning', spent_amount=80, percentage=80)
+        
+        response = self.client.get('/api/budgets/current_month/?fields=compact')
+        self.assertEqual(json.loads(response.content), [{
+            'id': budget.pk, 'category': 'food', 'limit': '100.00', 'spent_amount': '40.00', 'percentage_used': 40.0
+        }])
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/budgets/?fields=category,month')
+        self.assertEqual(json.loads(response.content), [{'category': 'food', 'month': date.today().month}])
+        self.assertFalse([q for q in queries.captured_queries if 'tracker_monthlyrollup' in q['sql']])
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/alerts/unread/?fields=alert_type,is_read')
+        self.assertEqual(json.loads(response.content), [{'alert_type': 'warning', 'is_read': False}])
+        self.assertFalse([q for q in queries.captured_queries if 'JOIN "tracker_budget"' in q['sql']])
+        
+        response = self.client.get('/api/alerts/?fields=compact')
+        self.assertEqual(json.loads(response.content)[0]['budget_category'], 'food')
+    
+    def test_mark_as_read_accepts_lists_and_all(self):
+        budget = Budget.objects.create(user=self.user, category='food', limit=100, month=1, year=2024)
+        alerts = [
+            BudgetAlert.objects.create(user=self.user, budget=budget, alert_type=alert_type, spent_amount=80, percentage=80)
+            for alert_type in ['warning', 'critical', 'warning']
+        ]
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/alerts/mark_as_read/', {
+                'alert_ids': [alerts[0].pk, alerts[1].pk]
+            }, content_type='application/json')
+        self.assertEqual(json.loads(response.content)['updated'], 2)
+        self.assertEqual(len([q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]), 1)
+        
+        response = self.client.post('/api/alerts/mark_as_read/', {'all': True}, content_type='application/json')
+        self.assertEqual(json.loads(response.content)['updated'], 1)
+        self.assertFalse(BudgetAlert.objects.filter(is_read=False).exists())
+        
+        response = self.client.post('/api/alerts/mark_as_read/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    def _create_forecast_history(self):
+        Budget.objects.create(user=self.user, category='food', limit=300, month=3, year=2024)
+        Budget.objects.create(user=self.user, category='transport', limit=50, month=3, year=2024)
+        for category, amount, day in [
+            ('food', 50, date(2024, 3, 1)),
+            ('food', 50, date(2024, 3, 5)),
+            ('food', 20, date(2024, 2, 2)),
+            ('food', 120, date(2024, 2, 25)),
+            ('food', 80, date(2024, 1, 28)),
+            ('transport', 30, date(2024, 3, 3)),
+        ]:
+            Transaction.objects.create(user=self.user, type='expense', category=category, amount=amount, date=day)
+    
+    def test_forecast_projects_run_rate_and_seasonal_spend(self):
+        self._create_forecast_history()
+        
+        with self.assertNumQueries(2):
+            food, transport = forecast_budgets([self.user], 2024, 3, today=date(2024, 3, 10))
+        
+        self.assertEqual(food['spent'], Decimal('100.00'))
+        self.assertEqual(food['run_rate'], Decimal('310.00'))
+        # Jan and Feb spent 80 and 120 after the 10th: 100 more on average.
+        self.assertEqual(food['seasonal'], Decimal('200.00'))
+        self.assertEqual(food['projected'], Decimal('200.00'))
+        self.assertFalse(food['on_track_to_exceed'])
+        
+        self.assertIsNone(transport['seasonal'])
+        self.assertEqual(transport['projected'], Decimal('93.00'))
+        self.assertEqual(transport['projected_percentage'], 186.0)
+        self.assertTrue(transport['on_track_to_exceed'])
+        
+        early = forecast_budgets([self.user], 2024, 3, today=date(2024, 3, 3))
+        self.assertFalse(early[1]['on_track_to_exceed'])
+    
+    def test_forecast_endpoint(self):
+        today = date.today()
+        budget = Budget.objects.create(user=self.user, category='food', limit=100, month=today.month, year=today.year)
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount=10, date=today)
+        
+        response = self.client.get('/api/budgets/forecast/')
+        data = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['days_elapsed'], today.day)
+        run_rate = 10 / today.day * data['days_in_month']
+        self.assertEqual(data['budgets'], [{
+            'id': budget.pk,
+            'category': 'food',
+            'limit': '100.00',
+            'spent': '10.00',
+            'projected': f'{run_rate:.2f}',
+            'run_rate_projection': f'{run_rate:.2f}',
+            'seasonal_projection': None,
+            'projected_percentage': round(run_rate, 2),
+            'on_track_to_exceed': run_rate > 100 and today.day >= settings.BUDGET_FORECAST_MIN_DAYS,
+        }])
+        
+        for query in ('month=13', 'month=june', 'year=0', 'year=99999'):
+            response = self.client.get(f'/api/budgets/forecast/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+        Budget.objects.create(user=self.user, category='food', limit=100, month=2, year=1)
+        response = self.client.get('/api/budgets/forecast/?month=2&year=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)['budgets']), 1)
+    
+    def test_forecast_batch_creates_one_alert_per_budget(self):
+        self._create_forecast_history()
+        
+        self.assertEqual(run_forecast_batch(today=date(2024, 3, 10)), {'users': 1, 'alerts': 1})
+        alert = BudgetAlert.objects.get(alert_type='forecast')
+        self.assertEqual(alert.budget.category, 'transport')
+        self.assertEqual(alert.spent_amount, Decimal('30.00'))
+        self.assertEqual(alert.percentage, Decimal('186.00'))
+        
+        out = StringIO()
+        call_command('forecast_budgets', '--date', '2024-03-10', stdout=out)
+        self.assertIn('created 0 alerts', out.getvalue())
+        self.assertEqual(BudgetAlert.objects.filter(alert_type='forecast').count(), 1)
 
 class DashboardTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', password='testpass123')
         self.client = Client()
         self.client.login(username='testuser', password='testpass123')
@@ -104,3 +599,591 @@ class DashboardTestCase(TestCase):
         self.assertEqual(float(data['total_income']), 3000.00)
         self.assertEqual(float(data['total_expenses']), 50.00)
         self.assertEqual(float(data['balance']), 2950.00)
+    
+    def test_chart_data_groups_categories_in_one_query(self):
+        for category, amount in [('food', 40.00), ('food', 10.00), ('transport', 20.00)]:
+            Transaction.objects.create(
+                user=self.user,
+                type='expense',
+                category=category,
+                amount=amount,
+                date=date(2024, 1, 10)
+            )
+        Transaction.objects.create(
+            user=self.user,
+            type='income',
+            category='salary',
+            amount=3000.00,
+            date=date(2024, 1, 1)
+        )
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/chart_data/?month=1&year=2024&type=both')
+        data = json.loads(response.content)
+        
+        self.assertEqual(data['expenses_by_category'], {'Food & Dining': '50.00', 'Transport': '20.00'})
+        self.assertEqual(data['income_by_category'], {'Salary': '3000.00'})
+        chart_queries = [q for q in queries.captured_queries if 'tracker_' in q['sql']]
+        self.assertEqual(len(chart_queries), 1)
+        
+        response = self.client.get('/api/dashboard/chart_data/?month=1&year=2024')
+        self.assertNotIn('income_by_category', json.loads(response.content))
+        
+        response = self.client.get('/api/dashboard/chart_data/?type=savings')
+        self.assertEqual(response.status_code, 400)
+
+    def test_overview_combines_dashboard_data_in_fixed_queries(self):
+        def overview():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/dashboard/overview/?limit=3')
+            self.assertEqual(response.status_code, 200)
+            return len(queries), json.loads(response.content)
+        
+        today = date.today()
+        budget = Budget.objects.create(user=self.user, category='food', limit=100, month=today.month, year=today.year)
+        BudgetAlert.objects.create(user=self.user, budget=budget, alert_type='warning', spent_amount=80, percentage=80)
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount=80.00, date=today)
+        small_count, data = overview()
+        
+        for _ in range(5):
+            Transaction.objects.create(user=self.user, type='income', category='salary', amount=100.00, date=today)
+        budget = Budget.objects.create(user=self.user, category='transport', limit=10, month=today.month, year=today.year)
+        BudgetAlert.objects.create(user=self.user, budget=budget, alert_type='critical', spent_amount=9, percentage=90)
+        large_count, data = overview()
+        
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(float(data['stats']['total_income']), 500.0)
+        self.assertEqual(data['stats']['budget_alerts_count'], 2)
+        self.assertEqual(data['expenses_by_category'], {'Food & Dining': '80.00'})
+        self.assertEqual(len(data['alerts']), 2)
+        self.assertEqual(len(data['recent_transactions']), 3)
+
+    @override_settings(USER_CACHE_ENABLED=True, AUTH_USER_CACHE_ENABLED=True,
+                       SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_stats_cache_is_invalidated_by_writes(self):
+        today = date.today()
+        self.client.get('/api/dashboard/stats/')
+        
+        # Session, user and stats all come from the cache.
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(float(json.loads(response.content)['total_expenses']), 0.0)
+        
+        self.client.post('/api/transactions/', {
+            'type': 'expense',
+            'category': 'food',
+            'amount': 42.00,
+            'date': today.isoformat()
+        }, content_type='application/json')
+        
+        response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(float(json.loads(response.content)['total_expenses']), 42.0)
+
+    def test_trends_use_calendar_months_in_one_query(self):
+        today = date.today()
+        first_of_month = today.replace(day=1)
+        last_month = first_of_month - timedelta(days=1)
+        Transaction.objects.create(user=self.user, type='income', category='salary', amount=1000.00, date=first_of_month)
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount=200.00, date=last_month)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/trends/?months=120')
+        data = json.loads(response.content)
+        trend_queries = [q for q in queries.captured_queries if 'tracker_' in q['sql']]
+        
+        self.assertEqual(len(trend_queries), 1)
+        self.assertEqual(len(data['periods']), 120)
+        self.assertEqual(data['periods'][-1], first_of_month.isoformat())
+        self.assertEqual(data['periods'][-2], last_month.replace(day=1).isoformat())
+        self.assertEqual(data['income'][-1], '1000.00')
+        self.assertEqual(data['balance'][-2], '-200.00')
+        self.assertEqual(set(data['expenses'][:-2]), {'0.00'})
+        
+        response = self.client.get('/api/dashboard/trends/?months=2&granularity=week')
+        data = json.loads(response.content)
+        self.assertEqual(sum(Decimal(value) for value in data['income']), 1000)
+        self.assertEqual(sum(Decimal(value) for value in data['expenses']), 200)
+        self.assertEqual(date.fromisoformat(data['periods'][0]).weekday(), 0)
+        
+        response = self.client.get('/api/dashboard/trends/?months=121')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(QUERY_METRICS_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_SAMPLE_RATE=1.0)
+    def test_query_metrics_middleware_reports_queries(self):
+        with self.assertLogs('tracker', level='INFO') as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/dashboard/stats/')
+        
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        
+        request_logs = [json.loads(r.getMessage()) for r in logs.records if r.name == 'tracker.requests']
+        self.assertEqual(request_logs[0]['queries'], len(queries))
+        self.assertEqual(request_logs[0]['path'], '/api/dashboard/stats/')
+        
+        slow_logs = [json.loads(r.getMessage()) for r in logs.records if r.name == 'tracker.slow_queries']
+        self.assertEqual(len(slow_logs), len(queries))
+        self.assertIn('SELECT', slow_logs[0]['sql'])
+
+class ServerRenderedPagesTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = Client()
+        self.client.login(username='testuser', password='testpass123')
+    
+    def _tracker_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode(), [q for q in queries.captured_queries if 'tracker_' in q['sql']]
+    
+    def test_pages_render_empty_by_default(self):
+        Transaction.objects.create(user=self.user, type='income', category='salary', amount=1000, date=date.today())
+        
+        content, queries = self._tracker_queries('/dashboard/')
+        self.assertIn('$0.00', content)
+        self.assertNotIn('id="dashboardData"', content)
+        self.assertEqual(queries, [])
+    
+    @override_settings(SERVER_RENDERED_PAGES=True, USER_CACHE_ENABLED=True)
+    def test_dashboard_fragments_are_cached_per_data_version(self):
+        Transaction.objects.create(user=self.user, type='income', category='salary', amount=1000, date=date.today())
+        
+        content, queries = self._tracker_queries('/dashboard/')
+        self.assertIn('$1000.00', content)
+        self.assertIn('id="dashboardData"', content)
+        self.assertTrue(queries)
+        
+        content, queries = self._tracker_queries('/dashboard/')
+        self.assertIn('$1000.00', content)
+        self.assertEqual(queries, [])
+        
+        Transaction.objects.create(user=self.user, type='expense', category='food', amount=40, date=date.today())
+        content, queries = self._tracker_queries('/dashboard/')
+        self.assertIn('$960.00', content)
+    
+    @override_settings(SERVER_RENDERED_PAGES=True, USER_CACHE_ENABLED=True)
+    def test_transactions_and_budgets_pages_embed_first_page(self):
+        today = date.today()
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, type='expense', category='food', amount=1, date=today)
+            for _ in range(settings.TRANSACTION_PAGE_SIZE + 1)
+        ])
+        MonthlyRollup.objects.rebuild(user=self.user)
+        Budget.objects.create(user=self.user, category='food', limit=100, month=today.month, year=today.year)
+        
+        # The cached fragment ignores the page's query string and links relatively.
+        content, _ = self._tracker_queries('/transactions/?page_size=2')
+        self.assertEqual(content.count('class="badge badge-expense"'), settings.TRANSACTION_PAGE_SIZE)
+        self.assertRegex(content, r'"next": "/api/transactions/\?cursor=[^"]+fields=table"')
+        content, _ = self._tracker_queries('/transactions/')
+        self.assertEqual(content.count('class="badge badge-expense"'), settings.TRANSACTION_PAGE_SIZE)
+        
+        content, _ = self._tracker_queries('/budgets/')
+        self.assertIn(f'${settings.TRANSACTION_PAGE_SIZE + 1}.00 / $100.00', content)
+        self.assertIn('id="budgetsData"', content)
+
+class MonthlyRollupTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+    
+    def rollup(self, year, month, category):
+        return MonthlyRollup.objects.filter(
+            user=self.user, year=year, month=month, type='expense', category=category
+        ).values_list('total', 'count').first()
+    
+    def test_rollup_follows_create_update_and_delete(self):
+        transaction = Transaction.objects.create(
+            user=self.user,
+            type='expense',
+            category='food',
+            amount=Decimal('20.00'),
+            date=date(2024, 1, 15)
+        )
+        Transaction.objects.create(
+            user=self.user,
+            type='expense',
+            category='food',
+            amount=Decimal('5.00'),
+            date=date(2024, 1, 20)
+        )
+        self.assertEqual(self.rollup(2024, 1, 'food'), (Decimal('25.00'), 2))
+        
+        transaction = Transaction.objects.get(pk=transaction.pk)
+        transaction.amount = Decimal('30.00')
+        transaction.save()
+        self.assertEqual(self.rollup(2024, 1, 'food'), (Decimal('35.00'), 2))
+        
+        transaction.date = date(2024, 2, 1)
+        transaction.category = 'transport'
+        transaction.save()
+        self.assertEqual(self.rollup(2024, 1, 'food'), (Decimal('5.00'), 1))
+        self.assertEqual(self.rollup(2024, 2, 'transport'), (Decimal('30.00'), 1))
+        
+        transaction.delete()
+        self.assertEqual(self.rollup(2024, 2, 'transport'), (Decimal('0.00'), 0))
+    
+    def test_rollup_follows_bulk_update_and_admin_delete(self):
+        for day in (10, 20):
+            Transaction.objects.create(
+                user=self.user, type='expense', category='food', amount=Decimal('10.00'), date=date(2024, 1, day)
+            )
+        
+        Transaction.objects.filter(date__day=20).update(date=date(2024, 2, 20), category='transport')
+        self.assertEqual(self.rollup(2024, 1, 'food'), (Decimal('10.00'), 1))
+        self.assertEqual(self.rollup(2024, 2, 'transport'), (Decimal('10.00'), 1))
+        
+        User.objects.create_superuser(username='admin', password='adminpass123')
+        client = Client()
+        client.login(username='admin', password='adminpass123')
+        version = get_user_version(self.user.pk)
+        response = client.post('/admin/tracker/transaction/', {
+            'action': 'delete_selected',
+            '_selected_action': list(Transaction.objects.values_list('pk', flat=True)),
+            'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertIsNone(self.rollup(2024, 1, 'food'))
+        self.assertIsNone(self.rollup(2024, 2, 'transport'))
+        self.assertNotEqual(get_user_version(self.user.pk), version)
+    
+    def test_rebuild_command_matches_transactions(self):
+        Transaction.objects.create(
+            user=self.user,
+            type='income',
+            category='salary',
+            amount=Decimal('3000.00'),
+            date=date(2024, 1, 1)
+        )
+        Transaction.objects.create(
+            user=self.user,
+            type='expense',
+            category='food',
+            amount=Decimal('12.50'),
+            date=date(2024, 1, 2)
+        )
+        MonthlyRollup.objects.all().delete()
+        
+        call_command('rebuild_rollups', stdout=StringIO())
+        
+        totals = MonthlyRollup.objects.month_totals(self.user, 2024, 1)
+        self.assertEqual(totals['income'], Decimal('3000.00'))
+        self.assertEqual(totals['expense'], Decimal('12.50'))
+        self.assertEqual(totals['count'], 2)
+
+class RecurringTransactionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = Client()
+        self.client.login(username='testuser', password='testpass123')
+    
+    def test_materialize_creates_due_rows_once(self):
+        rent = RecurringTransaction.objects.create(
+            user=self.user, type='expense', category='utilities', amount=1000,
+            frequency='monthly', start_date=date(2024, 1, 31)
+        )
+        salary = RecurringTransaction.objects.create(
+            user=self.user, type='income', category='salary', amount=3000,
+            frequency='monthly', start_date=date(2024, 1, 25), end_date=date(2024, 2, 28)
+        )
+        RecurringTransaction.objects.create(
+            user=self.user, type='expense', category='food', amount=20,
+            frequency='weekly', start_date=date(2024, 3, 1)
+        )
+        
+        with CaptureQueriesContext(connection) as queries:
+            result = materialize_recurring(today=date(2024, 3, 31))
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT') and 'INTO "tracker_transaction"' in q['sql']]
+        
+        self.assertEqual(result, {'rules': 3, 'created': 10})
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            list(Transaction.objects.filter(category='utilities').order_by('date').values_list('date', flat=True)),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31)]
+        )
+        rent.refresh_from_db()
+        salary.refresh_from_db()
+        self.assertEqual(rent.next_run, date(2024, 4, 30))
+        self.assertFalse(salary.is_active)
+        self.assertEqual(MonthlyRollup.objects.month_totals(self.user, 2024, 3)['expense'], Decimal('1100.00'))
+        self.assertEqual(BudgetAlertJob.objects.count(), 4)
+        
+        self.assertEqual(materialize_recurring(today=date(2024, 3, 31)), {'rules': 0, 'created': 0})
+        RecurringTransaction.objects.update(next_run=F('start_date'), is_active=True)
+        out = StringIO()
+        call_command('run_recurring_transactions', '--date', '2024-03-31', stdout=out)
+        self.assertIn('Created 0 transactions from 3 recurring rules', out.getvalue())
+        self.assertEqual(Transaction.objects.count(), 10)
+    
+    def test_recurring_api(self):
+        response = self.client.post('/api/recurring/', {
+            'type': 'expense',
+            'category': 'entertainment',
+            'amount': '9.99',
+            'frequency': 'monthly',
+            'start_date': '2024-05-15'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['next_run'], '2024-05-15')
+        
+        response = self.client.post('/api/recurring/', {
+            'type': 'expense',
+            'category': 'entertainment',
+            'amount': '9.99',
+            'frequency': 'monthly',
+            'start_date': '2024-05-15',
+            'end_date': '2024-05-01'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end_date', json.loads(response.content))
+
+class BenchmarkDataTestCase(TestCase):
+    def test_seed_benchmark_data_is_deterministic(self):
+        def snapshot():
+            call_command('seed_benchmark_data', '--users', '2', '--transactions', '50', '--months', '3',
+                         '--end-date', '2024-03-31', stdout=StringIO())
+            return list(Transaction.objects.order_by('user__username', 'date', 'amount', 'category').values_list(
+                'user__username', 'type', 'category', 'amount', 'date'
+            ))
+        
+        first = snapshot()
+        second = snapshot()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 100)
+        self.assertGreaterEqual(min(row[4] for row in first), date(2024, 1, 1))
+        self.assertEqual(Budget.objects.count(), 2 * 3 * len(Budget.CATEGORY_CHOICES))
+        self.assertEqual(
+            sum(row['count'] for row in MonthlyRollup.objects.values('count')),
+            100
+        )
+    
+    def test_run_benchmarks_leaves_the_cache_alone(self):
+        cache.set('tracker:test:sentinel', 'kept')
+        results = run_benchmarks([5], iterations=2, endpoints=['/api/dashboard/stats/'])
+        self.assertEqual(results[0]['status'], 200)
+        self.assertEqual(cache.get('tracker:test:sentinel'), 'kept')
+
+
+class DatabaseConfigTestCase(TestCase):
+    def test_database_from_url(self):
+        sqlite = database_from_url('sqlite:////tmp/finance.sqlite3', sqlite_timeout=5)
+        self.assertEqual(sqlite['ENGINE'], 'finance_tracker.db.sqlite3')
+        self.assertEqual(sqlite['NAME'], '/tmp/finance.sqlite3')
+        self.assertEqual(sqlite['OPTIONS'], {'timeout': 5})
+        
+        postgres = database_from_url('postgres://finance:p%40ss@db:6432/tracker?sslmode=require', conn_max_age=60)
+        self.assertEqual(postgres['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((postgres['USER'], postgres['PASSWORD']), ('finance', 'p@ss'))
+        self.assertEqual((postgres['HOST'], postgres['PORT'], postgres['NAME']), ('db', '6432', 'tracker'))
+        self.assertEqual(postgres['OPTIONS'], {'sslmode': 'require'})
+        self.assertEqual(postgres['CONN_MAX_AGE'], 60)
+        
+        pooled = database_from_url('postgresql://finance@db/tracker', conn_max_age=60, pool=True, pool_max_size=4)
+        self.assertEqual(pooled['ENGINE'], 'finance_tracker.db.postgresql_pool')
+        self.assertEqual(pooled['OPTIONS']['pool_max_size'], 4)
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+        
+        with self.assertRaises(ImproperlyConfigured):
+            database_from_url('mysql://db/tracker')
+    
+    def test_pool_backend_options_and_checkout(self):
+        class FakePool:
+            closed = False
+            
+            def __init__(self, min_size, max_size, **params):
+                self.max_size, self.idle, self.used = max_size, [], []
+            
+            def getconn(self):
+                if not self.idle and len(self.used) >= self.max_size:
+                    raise PoolError('connection pool exhausted')
+                conn = self.idle.pop() if self.idle else mock.Mock(closed=0)
+                self.used.append(conn)
+                return conn
+            
+            def putconn(self, conn, close=False):
+                self.used.remove(conn)
+                if not close:
+                    self.idle.append(conn)
+        
+        def wrapper(**options):
+            url = 'postgresql://finance@db/tracker'
+            database = database_from_url(url, pool=True, pool_max_size=1, pool_timeout=0.1)
+            database['OPTIONS'].update(options)
+            return pool_backend.DatabaseWrapper(connections.configure_settings({'default': database})['default'], alias='pooled')
+        
+        with mock.patch('psycopg2.pool.ThreadedConnectionPool', FakePool), \
+                mock.patch('psycopg2.extras.register_default_jsonb'), mock.patch.dict(pool_backend._pools, clear=True):
+            first = wrapper(isolation_level=IsolationLevel.SERIALIZABLE)
+            params = first.get_connection_params()
+            self.assertNotIn('pool_max_size', params)
+            self.assertNotIn('isolation_level', params)
+            self.assertEqual((first.pool_min_size, first.pool_max_size, first.pool_timeout), (1, 1, 0.1))
+            
+            first.connection = first.get_new_connection(params)
+            self.assertEqual(first.connection.isolation_level, IsolationLevel.SERIALIZABLE)
+            
+            second = wrapper(isolation_level=IsolationLevel.SERIALIZABLE)
+            second.get_connection_params()
+            with self.assertRaisesMessage(first.Database.OperationalError, 'exhausted'):
+                second.get_new_connection(params)
+            
+            conn = first.connection
+            first._close()
+            conn.rollback.assert_called_once()
+            self.assertIs(second.get_new_connection(params), conn)
+        
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper(pool_min_size=5).get_connection_params()
+
+
+class ReplicaRoutingTestCase(CommittingTestCase):
+    # Commits for real: the replica is a second connection and cannot see
+    # rows inside another connection's test transaction.
+    databases = '__all__'
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.payload = {'type': 'expense', 'category': 'food', 'amount': '10.00', 'description': 'Lunch',
+                        'date': str(date.today())}
+    
+    def test_router_only_leaves_primary_inside_read_from(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Transaction))
+        with read_from('replica'):
+            self.assertEqual(router.db_for_read(Transaction), 'replica')
+            self.assertEqual(router.db_for_write(Transaction), 'default')
+        self.assertIsNone(router.db_for_read(Transaction))
+        self.assertFalse(router.allow_migrate('replica', 'tracker'))
+    
+    @override_settings(DATABASE_REPLICA_ALIAS='default', REPLICA_STICKY_SECONDS=30)
+    def test_writes_pin_session_to_primary(self):
+        self.client.get('/api/dashboard/stats/')
+        self.assertNotIn(STICKY_SESSION_KEY, self.client.session)
+        
+        response = self.client.post('/api/transactions/', self.payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(self.client.session[STICKY_SESSION_KEY], time.time() + 20)
+    
+    @override_settings(DATABASE_REPLICA_ALIAS='default', REPLICA_STICKY_SECONDS=30, API_TOKEN_AUTH_ENABLED=True)
+    def test_token_writes_do_not_create_sessions(self):
+        client = Client()
+        credentials = {'username': 'testuser', 'password': 'testpass123', 'token': True}
+        token = json.loads(client.post('/api/auth/login/', credentials, content_type='application/json').content)['token']
+        sessions = Session.objects.count()
+        
+        response = client.post('/api/transactions/', self.payload, content_type='application/json',
+                               HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(Session.objects.count(), sessions)
+    
+    @override_settings(DATABASE_REPLICA_ALIAS='default', REPLICA_STICKY_SECONDS=30, USER_CACHE_ENABLED=True)
+    def test_replica_reads_are_not_cached_or_validated(self):
+        cache.clear()
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/dashboard/stats/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('ETag', response)
+            self.assertTrue([q for q in queries.captured_queries if 'tracker_' in q['sql']])
+        
+        # Inside the sticky window reads come from primary again.
+        self.client.post('/api/transactions/', self.payload, content_type='application/json')
+        response = self.client.get('/api/dashboard/stats/')
+        self.assertIn('ETag', response)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/dashboard/stats/')
+        self.assertFalse([q for q in queries.captured_queries if 'tracker_' in q['sql']])
+    
+    @unittest.skipUnless('replica' in settings.DATABASES, 'set DATABASE_REPLICA_URL to run against a replica')
+    def test_analytics_reads_use_replica_outside_sticky_window(self):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            self.assertEqual(self.client.get('/api/dashboard/stats/').status_code, 200)
+        self.assertTrue(queries.captured_queries)
+        
+        self.client.post('/api/transactions/', self.payload, content_type='application/json')
+        with CaptureQueriesContext(connections['replica']) as queries:
+            self.assertEqual(self.client.get('/api/dashboard/stats/').status_code, 200)
+            self.client.get('/api/transactions/')
+        self.assertEqual(queries.captured_queries, [])
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', AUTH_USER_CACHE_ENABLED=True)
+class AuthenticationCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+    
+    def auth_queries(self, client, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/auth/profile/', **extra)
+        return response.status_code, [
+            q['sql'] for q in queries.captured_queries if 'auth_user' in q['sql'] or 'django_session' in q['sql']
+        ]
+    
+    def test_session_and_user_are_cached_and_invalidated(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.auth_queries(self.client), (200, []))
+        
+        self.user.set_password('changed-pass-456')
+        self.user.save()
+        self.assertEqual(self.auth_queries(self.client)[0], 403)
+        
+        self.client.login(username='testuser', password='changed-pass-456')
+        self.client.post('/api/auth/logout/')
+        self.assertEqual(self.auth_queries(self.client)[0], 403)
+        
+        self.client.login(username='testuser', password='changed-pass-456')
+        self.user.delete()
+        self.assertEqual(self.auth_queries(self.client)[0], 403)
+    
+    def test_signed_token_login_and_logout(self):
+        credentials = {'username': 'testuser', 'password': 'testpass123', 'token': True}
+        response = self.client.post('/api/auth/login/', credentials, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        
+        with override_settings(API_TOKEN_AUTH_ENABLED=True):
+            client = Client()
+            response = client.post('/api/auth/login/', credentials, content_type='application/json')
+            token = json.loads(response.content)['token']
+            self.assertNotIn('sessionid', response.cookies)
+            
+            bearer = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+            self.assertEqual(self.auth_queries(client, **bearer), (200, []))
+            self.assertEqual(self.auth_queries(client, HTTP_AUTHORIZATION=f'Bearer {token}x')[0], 403)
+            
+            self.assertEqual(client.post('/api/auth/logout/', **bearer).status_code, 200)
+            self.assertEqual(self.auth_queries(client, **bearer)[0], 403)
+            
+            response = client.post('/api/auth/login/', credentials, content_type='application/json')
+            bearer = {'HTTP_AUTHORIZATION': f"Bearer {json.loads(response.content)['token']}"}
+            self.assertEqual(self.auth_queries(client, **bearer)[0], 200)
+            self.user.set_password('changed-pass-456')
+            self.user.save()
+            self.assertEqual(self.auth_queries(client, **bearer)[0], 403)
+    
+    @override_settings(AUTH_USER_CACHE_ENABLED=False)
+    def test_model_backend_sessions_and_uncached_users(self):
+        # Sessions from before CachedModelBackend recorded ModelBackend.
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        
+        self.client.login(username='testuser', password='testpass123')
+        status, queries = self.auth_queries(self.client)
+        self.assertEqual(status, 200)
+        self.assertTrue([sql for sql in queries if 'auth_user' in sql])
+        self.assertIsNone(cache.get(USER_KEY.format(self.user.pk)))
+    
+    def test_token_auth_requires_a_shared_cache(self):
+        self.assertEqual(check_token_revocation_cache(None), [])
+        with override_settings(API_TOKEN_AUTH_ENABLED=True):
+            self.assertEqual([error.id for error in check_token_revocation_cache(None)], ['tracker.E001'])
+            shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/tracker'}}
+            with override_settings(CACHES=shared):
+                self.assertEqual(check_token_revocation_cache(None), [])
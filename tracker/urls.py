@@ -2,13 +2,14 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     TransactionViewSet, BudgetViewSet, BudgetAlertViewSet,
-    DashboardViewSet, UserViewSet
+    DashboardViewSet, RecurringTransactionViewSet, UserViewSet
 )
 from .auth_views import register_view, login_view, logout_view, profile_view
 
 router = DefaultRouter()
 router.register(r'transactions', TransactionViewSet, basename='transaction')
 router.register(r'budgets', BudgetViewSet, basename='budget')
+router.register(r'recurring', RecurringTransactionViewSet, basename='recurring')
 router.register(r'alerts', BudgetAlertViewSet, basename='alert')
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
 router.register(r'users', UserViewSet, basename='user')
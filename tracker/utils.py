@@ -1,6 +1,11 @@
-from django.db.models import Sum
-from .models import Transaction, Budget, BudgetAlert
-from datetime import datetime
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+from .alerts import enqueue_budget_alerts
+from .models import Transaction, Budget, BudgetAlert, MonthlyRollup
+from .serializers import BudgetAlertSerializer, DashboardStatsSerializer, TransactionSerializer, format_money
+from .dates import add_months
+from datetime import date, datetime, timedelta
 
 def get_monthly_stats(user, month=None, year=None):
     if month is None:
@@ -8,92 +13,132 @@ def get_monthly_stats(user, month=None, year=None):
     if year is None:
         year = datetime.now().year
     
-    transactions = Transaction.objects.filter(
-        user=user,
-        date__month=month,
-        date__year=year
-    )
-    
-    income = transactions.filter(type='income').aggregate(total=Sum('amount'))['total'] or 0
-    expenses = transactions.filter(type='expense').aggregate(total=Sum('amount'))['total'] or 0
+    totals = MonthlyRollup.objects.month_totals(user, year, month)
+    income = totals['income']
+    expenses = totals['expense']
     
     return {
-        'income': float(income),
-        'expenses': float(expenses),
-        'balance': float(income - expenses),
+        'income': format_money(income),
+        'expenses': format_money(expenses),
+        'balance': format_money(income - expenses),
         'month': month,
         'year': year
     }
 
-def get_category_breakdown(user, month=None, year=None):
+def get_category_totals(user, month=None, year=None, types=('income', 'expense')):
     if month is None:
         month = datetime.now().month
     if year is None:
         year = datetime.now().year
     
-    transactions = Transaction.objects.filter(
+    rows = MonthlyRollup.objects.filter(
         user=user,
-        type='expense',
-        date__month=month,
-        date__year=year
-    )
+        year=year,
+        month=month,
+        type__in=types,
+        total__gt=0
+    ).values_list('type', 'category', 'total')
+    totals = {(type, category): total for type, category, total in rows}
     
-    breakdown = {}
+    breakdown = {type: {} for type in types}
     for category_code, category_name in Transaction.CATEGORY_CHOICES:
-        total = transactions.filter(category=category_code).aggregate(total=Sum('amount'))['total'] or 0
-        if total > 0:
-            breakdown[category_name] = float(total)
+        for type in types:
+            if (type, category_code) in totals:
+                breakdown[type][category_name] = format_money(totals[(type, category_code)])
     
     return breakdown
 
+def get_dashboard_stats(user, alerts_count):
+    now = timezone.now()
+    
+    totals = MonthlyRollup.objects.month_totals(user, now.year, now.month)
+    income = totals['income']
+    expenses = totals['expense']
+    
+    data = {
+        'total_income': income,
+        'total_expenses': expenses,
+        'balance': income - expenses,
+        'budget_alerts_count': alerts_count,
+        'transactions_count': totals['count']
+    }
+    
+    return DashboardStatsSerializer(data).data
+
+def get_dashboard_overview(user, limit):
+    """Stats, category chart, unread alerts and the latest ``limit`` transactions."""
+    now = timezone.now()
+    alerts = list(
+        BudgetAlert.objects.filter(user=user, is_read=False).select_related('budget')
+    )
+    transactions = Transaction.objects.filter(user=user).order_by(
+        '-date', '-created_at', '-id'
+    ).values(*TransactionSerializer.Meta.fields)[:limit]
+    
+    return {
+        'stats': get_dashboard_stats(user, len(alerts)),
+        'expenses_by_category': get_category_breakdown(user, now.month, now.year),
+        'alerts': BudgetAlertSerializer(alerts, many=True).data,
+        'recent_transactions': TransactionSerializer.represent_values(transactions),
+        'month': now.month,
+        'year': now.year
+    }
+
+def get_category_breakdown(user, month=None, year=None, type='expense'):
+    return get_category_totals(user, month, year, types=(type,))[type]
+
 def check_and_create_budget_alerts(user, month=None, year=None):
     if month is None:
         month = datetime.now().month
     if year is None:
         year = datetime.now().year
     
-    budgets = Budget.objects.filter(user=user, month=month, year=year)
-    
-    for budget in budgets:
-        spent = Transaction.objects.filter(
-            user=user,
-            type='expense',
-            category=budget.category,
-            date__month=month,
-            date__year=year
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        percentage = (spent / budget.limit * 100) if budget.limit > 0 else 0
-        
-        if percentage >= 90:
-            BudgetAlert.objects.get_or_create(
-                user=user,
-                budget=budget,
-                alert_type='critical',
-                defaults={'spent_amount': spent, 'percentage': percentage}
-            )
-        elif percentage >= 75:
-            BudgetAlert.objects.get_or_create(
-                user=user,
-                budget=budget,
-                alert_type='warning',
-                defaults={'spent_amount': spent, 'percentage': percentage}
-            )
+    categories = Budget.objects.filter(user=user, month=month, year=year).values_list('category', flat=True)
+    enqueue_budget_alerts(user, year, month, categories)
 
-def get_spending_trends(user, months=6):
-    from datetime import timedelta
-    from django.utils import timezone
-    
-    trends = []
-    now = timezone.now()
+def get_trends(user, months=6, granularity='month', today=None):
+    """Income/expense totals for the last ``months`` calendar months.
+
+    Periods are calendar months or ISO weeks (starting Monday). All periods are
+    read with one grouped query and empty periods are zero-filled.
+    """
+    if today is None:
+        today = timezone.localdate()
+    start_year, start_month = add_months(today.year, today.month, -(months - 1))
     
-    for i in range(months):
-        date = now - timedelta(days=30*i)
-        month = date.month
-        year = date.year
-        
-        stats = get_monthly_stats(user, month, year)
-        stats['label'] = f"{month}/{year}"
-        trends.append(stats)
+    if granularity == 'month':
+        rows = MonthlyRollup.objects.filter(user=user).filter(
+            Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month),
+            Q(year__lt=today.year) | Q(year=today.year, month__lte=today.month)
+        ).values('year', 'month', 'type').annotate(total=Sum('total')).order_by()
+        totals = {(date(row['year'], row['month'], 1), row['type']): row['total'] for row in rows}
+        periods = [date(*add_months(start_year, start_month, i), 1) for i in range(months)]
+    else:
+        start = date(start_year, start_month, 1)
+        start -= timedelta(days=start.weekday())
+        rows = Transaction.objects.filter(
+            user=user, date__gte=start, date__lte=today
+        ).annotate(period=TruncWeek('date')).values('period', 'type').annotate(total=Sum('amount')).order_by()
+        totals = {(row['period'], row['type']): row['total'] for row in rows}
+        periods = [start + timedelta(weeks=i) for i in range((today - start).days // 7 + 1)]
     
-    return list(reversed(trends))
+    trends = []
+    for period in periods:
+        income = totals.get((period, 'income')) or 0
+        expenses = totals.get((period, 'expense')) or 0
+        trends.append({
+            'period': period.isoformat(),
+            'label': f"{period.month}/{period.year}" if granularity == 'month' else period.isoformat(),
+            'income': format_money(income),
+            'expenses': format_money(expenses),
+            'balance': format_money(income - expenses)
+        })
+    return trends
+
+def get_spending_trends(user, months=6):
+    trends = get_trends(user, months)
+    for entry in trends:
+        period = date.fromisoformat(entry['period'])
+        entry['month'] = period.month
+        entry['year'] = period.year
+    return trends
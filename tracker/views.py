@@ -1,25 +1,189 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Q
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import datetime, timedelta
+import re
 
-from .models import Transaction, Budget, BudgetAlert
+from finance_tracker.db.routers import read_from, replica_alias_for
+
+from .alerts import schedule_budget_alerts
+from .anomalies import detect_anomalies
+from .cache import bump_user_version, cached_per_user, conditional_per_user, cache_stats as get_cache_stats
+from .exports import stream_transactions
+from .forecasting import forecast_budgets
+from .imports import ImportFailed, import_transactions, read_csv_rows
+from .models import Transaction, Budget, BudgetAlert, MonthlyRollup, RecurringTransaction
 from .serializers import (
     TransactionSerializer, BudgetSerializer, BudgetAlertSerializer,
-    DashboardStatsSerializer, UserSerializer
+    RecurringTransactionSerializer, UserSerializer, format_money
 )
+from .pagination import TransactionCursorPagination
+from .renderers import CSVRenderer, JSONLinesRenderer
+from .utils import get_category_totals, get_dashboard_overview, get_dashboard_stats, get_trends
 from django.contrib.auth.models import User
 
-class TransactionViewSet(viewsets.ModelViewSet):
+CHART_TYPES = {
+    'expense': ('expense',),
+    'income': ('income',),
+    'both': ('income', 'expense'),
+}
+
+OVERVIEW_MAX_TRANSACTIONS = 50
+
+TRENDS_MAX_MONTHS = 120
+
+GZIP_RE = re.compile(r'\bgzip\b')
+
+def get_month_params(params):
+    """``(year, month)`` from the query params, defaulting to the current month."""
+    now = timezone.now()
+    try:
+        month = int(params.get('month', now.month))
+        year = int(params.get('year', now.year))
+    except ValueError:
+        raise ValidationError({'month': 'month and year must be integers.'})
+    if not 1 <= month <= 12:
+        raise ValidationError({'month': 'month must be between 1 and 12.'})
+    if not 1 <= year < 9999:
+        raise ValidationError({'year': 'year must be between 1 and 9998.'})
+    return year, month
+
+class ReplicaReadMixin:
+    """Serve the read-only ``replica_actions`` from the read replica.
+
+    Sessions inside their sticky-after-write window stay on primary.
+    """
+    replica_actions = ()
+    
+    def dispatch(self, request, *args, **kwargs):
+        alias = None
+        if self.action_map.get(request.method.lower()) in self.replica_actions:
+            alias = replica_alias_for(request)
+        with read_from(alias):
+            return super().dispatch(request, *args, **kwargs)
+
+class ConditionalModelMixin:
+    """Conditional GET on list/retrieve and ``If-Match`` on updates."""
+    
+    @conditional_per_user
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_per_user
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    @conditional_per_user
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+class FieldSelectionMixin:
+    """``?fields=a,b`` or ``?fields=<projection>`` narrows reads to those fields.
+
+    The serializer drops every other field and ``narrow_queryset`` loads
+    only the columns listed in ``field_sources`` (by default the field's
+    own name). Writes always use the full serializer.
+    """
+    field_projections = {}
+    field_sources = {}
+    
+    def get_requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self._parse_requested_fields()
+        return self._requested_fields
+    
+    def _parse_requested_fields(self):
+        param = self.request.query_params.get('fields')
+        if not param or self.request.method not in ('GET', 'HEAD'):
+            return None
+        if param in self.field_projections:
+            return list(self.field_projections[param])
+        
+        allowed = self.get_serializer_class().Meta.fields
+        names = {name.strip() for name in param.split(',') if name.strip()}
+        unknown = sorted(names - set(allowed))
+        if unknown or not names:
+            raise ValidationError({'fields': (
+                f"Unknown field(s): {', '.join(unknown)}. Use a comma separated list of "
+                f"{', '.join(allowed)} or one of: {', '.join(self.field_projections)}."
+            )})
+        return [name for name in allowed if name in names]
+    
+    def wants_field(self, name):
+        fields = self.get_requested_fields()
+        return fields is None or name in fields
+    
+    def narrow_queryset(self, queryset):
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        columns = {'id'}
+        for name in fields:
+            columns.update(self.field_sources.get(name, (name,)))
+        return queryset.only(*columns)
+    
+    def filter_queryset(self, queryset):
+        return self.narrow_queryset(super().filter_queryset(queryset))
+    
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+class TransactionViewSet(ReplicaReadMixin, ConditionalModelMixin, FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TransactionCursorPagination
+    replica_actions = ('by_category', 'monthly_summary')
+    
+    field_projections = {
+        'compact': ['id', 'type', 'category', 'amount', 'date'],
+        'table': ['id', 'type', 'category', 'amount', 'description', 'date'],
+    }
     
     def get_queryset(self):
         return Transaction.objects.filter(user=self.request.user)
     
+    def _values(self, queryset):
+        fields = self.get_requested_fields() or TransactionSerializer.Meta.fields
+        # The cursor paginator reads the position from ``date``.
+        columns = fields if 'date' in fields else [*fields, 'date']
+        return queryset.values(*columns)
+    
+    @conditional_per_user
+    def list(self, request, *args, **kwargs):
+        fields = self.get_requested_fields()
+        queryset = self._values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(TransactionSerializer.represent_values(page, fields))
+        return Response(TransactionSerializer.represent_values(queryset, fields))
+    
+    def filter_queryset(self, queryset):
+        params = self.request.query_params
+        
+        if params.get('type'):
+            queryset = queryset.filter(type=params['type'])
+        if params.get('category'):
+            queryset = queryset.filter(category=params['category'])
+        
+        for param, lookup in (('from', 'date__gte'), ('to', 'date__lte')):
+            if params.get(param):
+                try:
+                    value = parse_date(params[param])
+                except ValueError:
+                    value = None
+                if value is None:
+                    raise ValidationError({param: 'Use the YYYY-MM-DD format.'})
+                queryset = queryset.filter(**{lookup: value})
+        
+        return super().filter_queryset(queryset)
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
         self._check_budget_alerts(serializer.instance)
@@ -30,169 +194,264 @@ class TransactionViewSet(viewsets.ModelViewSet):
     
     def _check_budget_alerts(self, transaction):
         if transaction.type == 'expense':
-            budget = Budget.objects.filter(
-                user=transaction.user,
-                category=transaction.category,
-                month=transaction.date.month,
-                year=transaction.date.year
-            ).first()
-            
-            if budget:
-                spent = Transaction.objects.filter(
-                    user=transaction.user,
-                    type='expense',
-                    category=transaction.category,
-                    date__month=transaction.date.month,
-                    date__year=transaction.date.year
-                ).aggregate(total=Sum('amount'))['total'] or 0
-                
-                percentage = (spent / budget.limit * 100) if budget.limit > 0 else 0
-                
-                if percentage >= 90:
-                    BudgetAlert.objects.get_or_create(
-                        user=transaction.user,
-                        budget=budget,
-                        alert_type='critical',
-                        defaults={'spent_amount': spent, 'percentage': percentage}
-                    )
-                elif percentage >= 75:
-                    BudgetAlert.objects.get_or_create(
-                        user=transaction.user,
-                        budget=budget,
-                        alert_type='warning',
-                        defaults={'spent_amount': spent, 'percentage': percentage}
-                    )
+            schedule_budget_alerts(
+                transaction.user,
+                transaction.date.year,
+                transaction.date.month,
+                [transaction.category]
+            )
+    
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, JSONLinesRenderer])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        gzip = bool(GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        return stream_transactions(queryset, request.accepted_renderer.format, 'transactions', gzip=gzip)
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        if 'csv' in (request.content_type or ''):
+            rows = read_csv_rows(request.stream or [])
+        else:
+            rows = request.data
+            if not isinstance(rows, list):
+                return Response({'error': 'Expected a JSON array of transactions'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = import_transactions(request.user, rows)
+        except ImportFailed as exc:
+            return Response({'created': 0, 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
     
     @action(detail=False, methods=['get'])
+    @conditional_per_user
     def by_category(self, request):
         category = request.query_params.get('category')
-        month = request.query_params.get('month', timezone.now().month)
-        year = request.query_params.get('year', timezone.now().year)
+        year, month = get_month_params(request.query_params)
         
-        queryset = self.get_queryset().filter(
-            date__month=month,
-            date__year=year
-        )
+        queryset = self.get_queryset().in_month(year, month)
         
         if category:
             queryset = queryset.filter(category=category)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(TransactionSerializer.represent_values(self._values(queryset), self.get_requested_fields()))
     
     @action(detail=False, methods=['get'])
+    @conditional_per_user
+    @cached_per_user('monthly_summary')
     def monthly_summary(self, request):
-        month = request.query_params.get('month', timezone.now().month)
-        year = request.query_params.get('year', timezone.now().year)
+        year, month = get_month_params(request.query_params)
         
-        transactions = self.get_queryset().filter(
-            date__month=month,
-            date__year=year
-        )
-        
-        income = transactions.filter(type='income').aggregate(total=Sum('amount'))['total'] or 0
-        expenses = transactions.filter(type='expense').aggregate(total=Sum('amount'))['total'] or 0
+        totals = MonthlyRollup.objects.month_totals(request.user, year, month)
+        income = totals['income']
+        expenses = totals['expense']
         
         return Response({
             'month': month,
             'year': year,
-            'income': float(income),
-            'expenses': float(expenses),
-            'balance': float(income - expenses)
+            'income': format_money(income),
+            'expenses': format_money(expenses),
+            'balance': format_money(income - expenses)
         })
+    
+    @action(detail=False, methods=['get'])
+    @conditional_per_user
+    def anomalies(self, request):
+        reason = request.query_params.get('reason')
+        if reason not in (None, 'outlier', 'duplicate'):
+            return Response({'error': 'reason must be outlier or duplicate'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        anomalies = detect_anomalies(request.user.pk)
+        if reason:
+            anomalies = [anomaly for anomaly in anomalies if reason in anomaly['reasons']]
+        return Response({'count': len(anomalies), 'anomalies': anomalies})
 
-class BudgetViewSet(viewsets.ModelViewSet):
+class BudgetViewSet(ConditionalModelMixin, FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
     permission_classes = [IsAuthenticated]
+    field_projections = {
+        'compact': ['id', 'category', 'limit', 'spent_amount', 'percentage_used'],
+    }
+    field_sources = {
+        'spent_amount': (),
+        'percentage_used': ('limit',),
+    }
     
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user)
+        queryset = Budget.objects.filter(user=self.request.user)
+        if self.wants_field('spent_amount') or self.wants_field('percentage_used'):
+            queryset = queryset.with_spent()
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
     @action(detail=False, methods=['get'])
+    @conditional_per_user
+    @cached_per_user('current_month')
     def current_month(self, request):
         now = timezone.now()
-        budgets = self.get_queryset().filter(month=now.month, year=now.year)
+        budgets = self.narrow_queryset(self.get_queryset().filter(month=now.month, year=now.year))
         serializer = self.get_serializer(budgets, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    @conditional_per_user
+    @cached_per_user('forecast')
+    def forecast(self, request):
+        year, month = get_month_params(request.query_params)
+        forecasts = forecast_budgets([request.user], year, month)
+        return Response({
+            'month': month,
+            'year': year,
+            'days_elapsed': forecasts[0]['days_elapsed'] if forecasts else None,
+            'days_in_month': forecasts[0]['days_in_month'] if forecasts else None,
+            'budgets': [
+                {
+                    'id': forecast['budget'].id,
+                    'category': forecast['budget'].category,
+                    'limit': format_money(forecast['budget'].limit),
+                    'spent': format_money(forecast['spent']),
+                    'projected': format_money(forecast['projected']),
+                    'run_rate_projection': format_money(forecast['run_rate']),
+                    'seasonal_projection': (
+                        format_money(forecast['seasonal']) if forecast['seasonal'] is not None else None
+                    ),
+                    'projected_percentage': forecast['projected_percentage'],
+                    'on_track_to_exceed': forecast['on_track_to_exceed'],
+                }
+                for forecast in forecasts
+            ]
+        })
+
+class RecurringTransactionViewSet(ConditionalModelMixin, viewsets.ModelViewSet):
+    serializer_class = RecurringTransactionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return RecurringTransaction.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
 
-class BudgetAlertViewSet(viewsets.ReadOnlyModelViewSet):
+class BudgetAlertViewSet(FieldSelectionMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = BudgetAlertSerializer
     permission_classes = [IsAuthenticated]
+    field_projections = {
+        'compact': ['id', 'budget_category', 'alert_type', 'percentage', 'is_read'],
+    }
+    field_sources = {
+        'budget_category': ('budget__category',),
+    }
     
     def get_queryset(self):
-        return BudgetAlert.objects.filter(user=self.request.user)
+        queryset = BudgetAlert.objects.filter(user=self.request.user)
+        if self.wants_field('budget_category'):
+            queryset = queryset.select_related('budget')
+        return queryset
     
     @action(detail=False, methods=['get'])
     def unread(self, request):
-        alerts = self.get_queryset().filter(is_read=False)
+        alerts = self.narrow_queryset(self.get_queryset().filter(is_read=False))
         serializer = self.get_serializer(alerts, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def mark_as_read(self, request):
+        alerts = BudgetAlert.objects.filter(user=request.user, is_read=False)
+        mark_all = request.data.get('all')
+        alert_ids = request.data.get('alert_ids')
         alert_id = request.data.get('alert_id')
-        if alert_id:
-            BudgetAlert.objects.filter(id=alert_id, user=request.user).update(is_read=True)
-            return Response({'status': 'marked as read'})
-        return Response({'error': 'alert_id required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if mark_all in (True, 'true', 'True', '1'):
+            pass
+        elif alert_ids is not None or alert_id:
+            if alert_ids is None:
+                alert_ids = [alert_id]
+            if not isinstance(alert_ids, list):
+                return Response({'error': 'alert_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                alert_ids = [int(pk) for pk in alert_ids]
+            except (TypeError, ValueError):
+                return Response({'error': 'alert_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+            alerts = alerts.filter(id__in=alert_ids)
+        else:
+            return Response({'error': 'alert_id, alert_ids or all required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        updated = alerts.update(is_read=True)
+        if updated:
+            bump_user_version(request.user.pk)
+        return Response({'status': 'marked as read', 'updated': updated})
 
-class DashboardViewSet(viewsets.ViewSet):
+class DashboardViewSet(ReplicaReadMixin, viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
+    replica_actions = ('stats', 'overview', 'chart_data', 'trends')
     
     @action(detail=False, methods=['get'])
+    @conditional_per_user
+    @cached_per_user('stats')
     def stats(self, request):
-        now = timezone.now()
-        
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            date__month=now.month,
-            date__year=now.year
-        )
+        alerts = BudgetAlert.objects.filter(user=request.user, is_read=False).count()
+        return Response(get_dashboard_stats(request.user, alerts))
+    
+    @action(detail=False, methods=['get'])
+    @conditional_per_user
+    @cached_per_user('overview')
+    def overview(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 5)), 1), OVERVIEW_MAX_TRANSACTIONS)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         
-        income = transactions.filter(type='income').aggregate(total=Sum('amount'))['total'] or 0
-        expenses = transactions.filter(type='expense').aggregate(total=Sum('amount'))['total'] or 0
+        return Response(get_dashboard_overview(request.user, limit))
+    
+    @action(detail=False, methods=['get'])
+    @conditional_per_user
+    @cached_per_user('chart_data')
+    def chart_data(self, request):
+        year, month = get_month_params(request.query_params)
+        chart_type = request.query_params.get('type', 'expense')
         
-        alerts = BudgetAlert.objects.filter(user=request.user, is_read=False).count()
+        if chart_type not in CHART_TYPES:
+            return Response({'error': 'type must be income, expense or both'}, status=status.HTTP_400_BAD_REQUEST)
         
-        data = {
-            'total_income': float(income),
-            'total_expenses': float(expenses),
-            'balance': float(income - expenses),
-            'budget_alerts_count': alerts,
-            'transactions_count': transactions.count()
-        }
+        breakdown = get_category_totals(request.user, month, year, types=CHART_TYPES[chart_type])
         
-        serializer = DashboardStatsSerializer(data)
-        return Response(serializer.data)
+        data = {'month': month, 'year': year}
+        if 'expense' in breakdown:
+            data['expenses_by_category'] = breakdown['expense']
+        if 'income' in breakdown:
+            data['income_by_category'] = breakdown['income']
+        return Response(data)
     
     @action(detail=False, methods=['get'])
-    def chart_data(self, request):
-        month = request.query_params.get('month', timezone.now().month)
-        year = request.query_params.get('year', timezone.now().year)
-        
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            date__month=month,
-            date__year=year
-        )
-        
-        expense_by_category = {}
-        for category_code, category_name in Transaction.CATEGORY_CHOICES:
-            total = transactions.filter(
-                type='expense',
-                category=category_code
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            if total > 0:
-                expense_by_category[category_name] = float(total)
+    @conditional_per_user
+    @cached_per_user('trends')
+    def trends(self, request):
+        granularity = request.query_params.get('granularity', 'month')
+        try:
+            months = int(request.query_params.get('months', 6))
+        except ValueError:
+            months = 0
+        
+        if not 1 <= months <= TRENDS_MAX_MONTHS:
+            return Response({'error': f'months must be between 1 and {TRENDS_MAX_MONTHS}'}, status=status.HTTP_400_BAD_REQUEST)
+        if granularity not in ('month', 'week'):
+            return Response({'error': 'granularity must be month or week'}, status=status.HTTP_400_BAD_REQUEST)
         
+        trends = get_trends(request.user, months, granularity)
         return Response({
-            'expenses_by_category': expense_by_category,
-            'month': month,
-            'year': year
+            'granularity': granularity,
+            'months': months,
+            'labels': [entry['label'] for entry in trends],
+            'periods': [entry['period'] for entry in trends],
+            'income': [entry['income'] for entry in trends],
+            'expenses': [entry['expenses'] for entry in trends],
+            'balance': [entry['balance'] for entry in trends]
         })
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(get_cache_stats())
 
 class UserViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]